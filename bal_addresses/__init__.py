@@ -5,13 +5,18 @@ from .addresses import (
     GITHUB_RAW_OUTPUTS,
     GITHUB_RAW_EXTRAS,
 )
+from .cache import SourceCache, source_cache, get_json
 from .permissions import BalPermissions
-from .utils import to_checksum_address, is_address
+from .aio import AsyncAddrBook, AsyncBalPermissions
+from .binary import BinaryAddrBook
+from .subgraph import SubgraphResolver
+from .utils import to_checksum_address, to_checksum_addresses, is_address
 from .errors import (
     MultipleMatchesError,
     NoResultError,
     ChecksumError,
     UnexpectedListLengthError,
+    GraphQLRequestError,
 )
 
 from .rate_providers import RateProviders
@@ -2,14 +2,21 @@ import json
 import os.path
 from .errors import MultipleMatchesError, NoResultError
 from typing import Dict
-from typing import Optional
+from typing import Iterable, Optional
 from .rate_providers import RateProviders
-import requests
 from munch import Munch
 from web3 import Web3
 from collections import defaultdict
 
-from .utils import to_checksum_address
+from .cache import get_json, source_cache
+from .executor import DEFAULT_MAX_WORKERS, map_chains, map_chains_isolated
+from .search import SubstringIndex
+from .utils import (
+    checksum_if_address,
+    is_address,
+    lazy_class_attribute,
+    to_checksum_address,
+)
 
 
 GITHUB_MONOREPO_RAW = (
@@ -27,26 +34,61 @@ GITHUB_RAW_EXTRAS = (
     "https://raw.githubusercontent.com/balancer/bal_addresses/main/extras"
 )
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+# Namespaces of the flatbook in order of precedence, later ones overwrite earlier ones.
+# Pools and gauges come first so a deployment label takes precedence over a pool/gauge label
+FLATBOOK_NAMESPACES = (
+    "pools",
+    "gauges",
+    "root_gauges",
+    "deployments",
+    "extras",
+    "multisigs",
+    "EOA",
+    "rate_providers",
+)
+
+# Copy of extras/chains.json shipped with the package
+BUNDLED_CHAINS = os.path.join(os.path.dirname(__file__), "chains.json")
 
 
 class AddrBook:
-    chains = Munch.fromDict(
-        json.load(open("extras/chains.json"))
-        if os.path.exists("extras/chains.json")
-        else requests.get(f"{GITHUB_RAW_EXTRAS}/chains.json").json()
-    )
-    fx_description_by_name = Munch.fromDict(
-        json.load(open("extras/func_desc_by_name.json"))
-        if os.path.exists("extras/func_desc_by_name.json")
-        else requests.get(f"{GITHUB_RAW_EXTRAS}/func_desc_by_name.json").json()
-    )
-    chain_ids_by_name = chains.CHAIN_IDS_BY_NAME
-    chain_names_by_id = {v: k for k, v in chain_ids_by_name.items()}
+    @lazy_class_attribute
+    def chains(cls) -> Munch:
+        """
+        Chain metadata from extras/chains.json when running inside this repo,
+        otherwise from the copy bundled with the package
+        """
+        path = (
+            "extras/chains.json"
+            if os.path.exists("extras/chains.json")
+            else BUNDLED_CHAINS
+        )
+        return Munch.fromDict(json.load(open(path)))
 
-    def __init__(self, chain, jsonfile=False):
+    @lazy_class_attribute
+    def fx_description_by_name(cls) -> Munch:
+        return Munch.fromDict(
+            get_json(
+                f"{GITHUB_RAW_EXTRAS}/func_desc_by_name.json",
+                "extras/func_desc_by_name.json",
+            )
+            or {}
+        )
+
+    @lazy_class_attribute
+    def chain_ids_by_name(cls) -> Munch:
+        return cls.chains.CHAIN_IDS_BY_NAME
+
+    @lazy_class_attribute
+    def chain_names_by_id(cls) -> dict:
+        return {v: k for k, v in cls.chain_ids_by_name.items()}
+
+    def __init__(self, chain, jsonfile=False, strict=False):
         self.jsonfile = jsonfile
         self.chain = chain
-        deployments = requests.get(f"{GITHUB_RAW_OUTPUTS}/deployments.json").json()
+        # raise when a namespace fails to load instead of leaving it empty
+        self.strict = strict
+        deployments = get_json(f"{GITHUB_RAW_OUTPUTS}/deployments.json") or {}
         try:
             dold = deployments["old"][chain]
         except Exception:
@@ -56,12 +98,12 @@ class AddrBook:
         except Exception:
             dactive = {}
         self.deployments_only = Munch.fromDict(dactive | dold)
-        try:
-            self.flatbook = self.generate_flatbook()
-            self.reversebook = {value: key for key, value in self.flatbook.items()}
-        except:
-            self.flatbook = {}
-            self.reversebook = {}
+        self._flat_namespaces = {}
+        self._flatbook = None
+        self._reversebook = None
+        self._search_indexes = {}
+        self._deployments_index = None
+        self._versions_by_contract = None
         self._deployments = None
         self._extras = None
         self._multisigs = None
@@ -71,6 +113,69 @@ class AddrBook:
         self._root_gauges = None
         self._rate_providers = None
 
+    @staticmethod
+    def sources(chain) -> list[tuple[str, Optional[str]]]:
+        """
+        (url, local_path) of every source read by an AddrBook for chain
+        """
+        sources = [
+            (f"{GITHUB_RAW_OUTPUTS}/deployments.json", None),
+            (f"{GITHUB_DEPLOYMENTS_RAW}/addresses/{chain}.json", None),
+            (f"{GITHUB_RAW_EXTRAS}/{chain}.json", None),
+            (f"{GITHUB_RAW_EXTRAS}/signers.json", None),
+            (f"{GITHUB_RAW_EXTRAS}/multisigs.json", None),
+            (f"{GITHUB_RAW_OUTPUTS}/pools.json", "outputs/pools.json"),
+            (f"{GITHUB_RAW_OUTPUTS}/gauges.json", "outputs/gauges.json"),
+            (RateProviders.source_url(), None),
+        ]
+        if chain == "mainnet":
+            sources.append(
+                (f"{GITHUB_RAW_OUTPUTS}/root_gauges.json", "outputs/root_gauges.json")
+            )
+        return sources
+
+    @property
+    def flatbook(self) -> dict[str, str]:
+        """
+        All known addresses by path, built from every namespace on first access
+        """
+        if self._flatbook is None:
+            self._flatbook = self.generate_flatbook()
+        return self._flatbook
+
+    @flatbook.setter
+    def flatbook(self, flatbook: dict[str, str]) -> None:
+        self._flatbook = flatbook
+        self._reversebook = None
+        self._search_indexes = {}
+
+    @property
+    def reversebook(self) -> dict[str, str]:
+        """
+        Path by address, if an address has several paths the one with the highest precedence wins
+        """
+        if self._reversebook is None:
+            self._reversebook = {value: key for key, value in self.flatbook.items()}
+        return self._reversebook
+
+    @property
+    def deployments_index(self) -> SubstringIndex:
+        """
+        Substring index over the deployment names in deployments_only
+        """
+        if self._deployments_index is None:
+            self._deployments_index = SubstringIndex(self.deployments_only)
+        return self._deployments_index
+
+    @property
+    def versions_by_contract(self) -> dict[str, list[dict[str, str]]]:
+        """
+        Every deployment of each contract name as {path, address}, oldest deployment first
+        """
+        if self._versions_by_contract is None:
+            self._versions_by_contract = index_contract_versions(self.deployments_only)
+        return self._versions_by_contract
+
     @property
     def deployments(self) -> Optional[Munch]:
         """
@@ -160,12 +265,12 @@ class AddrBook:
         return self._rate_providers
 
     def populate_deployments(self) -> None:
-        chain_deployments = requests.get(
+        chain_deployments = get_json(
             f"{GITHUB_DEPLOYMENTS_RAW}/addresses/{self.chain}.json"
         )
-        if chain_deployments.ok:
+        if chain_deployments is not None:
             # Remove date from key
-            processed_deployment = self._process_deployment(chain_deployments.json())
+            processed_deployment = self._process_deployment(chain_deployments)
             self._deployments = Munch.fromDict(processed_deployment)
         else:
             print(f"Warning: No deploys for chain {self.chain}")
@@ -193,16 +298,15 @@ class AddrBook:
                 contracts_by_contract = {
                     contract: data for contract, data in contracts.items()
                 }
-                v["contracts"] = contracts_by_contract
+                # copy, the source dict is shared through the cache
+                v = {**v, "contracts": contracts_by_contract}
             processed_deployment[deployment_identifier] = v
         return processed_deployment
 
     def populate_extras(self) -> None:
-        chain_extras = requests.get(f"{GITHUB_RAW_EXTRAS}/{self.chain}.json")
-        if chain_extras.ok:
-            self._extras = Munch.fromDict(
-                self.checksum_address_dict(chain_extras.json())
-            )
+        chain_extras = get_json(f"{GITHUB_RAW_EXTRAS}/{self.chain}.json")
+        if chain_extras is not None:
+            self._extras = Munch.fromDict(self.checksum_address_dict(chain_extras))
         else:
             print(
                 f"Warning: No extras for chain {self.chain}, extras must be added in extras/chain.json"
@@ -210,12 +314,12 @@ class AddrBook:
             self._extras = Munch.fromDict({})
 
     def populate_eoas(self) -> None:
-        eoas = requests.get(f"{GITHUB_RAW_EXTRAS}/signers.json")
-        if eoas.ok:
-            self._eoas = Munch.fromDict(self.checksum_address_dict(eoas.json()))
+        eoas = get_json(f"{GITHUB_RAW_EXTRAS}/signers.json")
+        if eoas is not None:
+            self._eoas = Munch.fromDict(self.checksum_address_dict(eoas))
 
     def populate_multisigs(self) -> None:
-        msigs = requests.get(f"{GITHUB_RAW_EXTRAS}/multisigs.json").json()
+        msigs = get_json(f"{GITHUB_RAW_EXTRAS}/multisigs.json") or {}
         if msigs.get(self.chain):
             self._multisigs = Munch.fromDict(
                 self.checksum_address_dict(msigs[self.chain])
@@ -227,11 +331,7 @@ class AddrBook:
             self._multisigs = Munch.fromDict({})
 
     def populate_pools(self) -> None:
-        pools = (
-            json.load(open("outputs/pools.json"))
-            if os.path.exists("outputs/pools.json")
-            else requests.get(f"{GITHUB_RAW_OUTPUTS}/pools.json").json()
-        )
+        pools = get_json(f"{GITHUB_RAW_OUTPUTS}/pools.json", "outputs/pools.json") or {}
         if pools.get(self.chain):
             self._pools = Munch.fromDict(self.checksum_address_dict(pools[self.chain]))
         else:
@@ -240,9 +340,7 @@ class AddrBook:
 
     def populate_gauges(self) -> None:
         gauges = (
-            json.load(open("outputs/gauges.json"))
-            if os.path.exists("outputs/gauges.json")
-            else requests.get(f"{GITHUB_RAW_OUTPUTS}/gauges.json").json()
+            get_json(f"{GITHUB_RAW_OUTPUTS}/gauges.json", "outputs/gauges.json") or {}
         )
         if gauges.get(self.chain):
             self._gauges = Munch.fromDict(
@@ -255,9 +353,10 @@ class AddrBook:
     def populate_root_gauges(self) -> None:
         if self.chain == "mainnet":
             root_gauges = (
-                json.load(open("outputs/root_gauges.json"))
-                if os.path.exists("outputs/root_gauges.json")
-                else requests.get(f"{GITHUB_RAW_OUTPUTS}/root_gauges.json").json()
+                get_json(
+                    f"{GITHUB_RAW_OUTPUTS}/root_gauges.json", "outputs/root_gauges.json"
+                )
+                or {}
             )
             if root_gauges.get(self.chain):
                 self._root_gauges = Munch.fromDict(
@@ -284,18 +383,22 @@ class AddrBook:
         self._rate_providers = Munch.fromDict(rate_providers)
         return self._rate_providers
 
-    def search_unique(self, substr):
-        results = [s for s in self.flatbook.keys() if substr in s]
+    def search_unique(self, substr, namespaces: Optional[Iterable[str]] = None):
+        """
+        The one path containing substr with its address.
+        Searches the whole flatbook unless restricted to some namespaces, e.g.
+        namespaces=["deployments"] only loads and searches the deployments
+        """
+        book, index = self._search_index(namespaces)
+        results = index.search(substr)
         if len(results) > 1:
             raise MultipleMatchesError(f"{substr} Multiple matches found: {results}")
         if len(results) < 1:
             raise NoResultError(f"{substr}")
-        return Munch.fromDict(
-            {"path": results[0], "address": self.flatbook[results[0]]}
-        )
+        return Munch.fromDict({"path": results[0], "address": book[results[0]]})
 
     def search_unique_deployment(self, substr):
-        results = [s for s in self.deployments_only.keys() if substr in s]
+        results = self.deployments_index.search(substr)
         if len(results) > 1:
             raise MultipleMatchesError(f"{substr} Multiple matches found: {results}")
         if len(results) < 1:
@@ -308,105 +411,372 @@ class AddrBook:
         )
 
     def search_many_deployments(self, substr):
-        search = [s for s in self.deployments_only.keys() if substr in s]
+        search = self.deployments_index.search(substr)
         return search
 
-    def search_many(self, substr):
-        output = []
-        results = {
-            path: address for path, address in self.flatbook.items() if substr in path
-        }
+    def search_many(self, substr, namespaces: Optional[Iterable[str]] = None):
+        """
+        Every path containing substr with its address, namespaces as in search_unique
+        """
+        book, index = self._search_index(namespaces)
         outputs = [
-            Munch.fromDict({"path": path, "address": address})
-            for path, address in results.items()
+            Munch.fromDict({"path": path, "address": book[path]})
+            for path in index.search(substr)
         ]
         return outputs
 
     def latest_contract(self, contract_name):
-        deployments = []
-        for deployment, contractData in self.deployments_only.items():
-            if contract_name in contractData.keys():
-                deployments.append(deployment)
-        if len(deployments) == 0:
+        """
+        Address of the latest deployment of a contract, with the flatbook path that address
+        is listed under (which may be outside the deployments, e.g. tokens/WETH)
+        """
+        versions = self.versions_by_contract.get(contract_name)
+        if not versions:
             raise NoResultError(contract_name)
-        deployments.sort(reverse=True)
-        address = self.deployments_only[deployments[0]][contract_name]
-        return Munch.fromDict({"path": self.reversebook[address], "address": address})
+        address = versions[-1]["address"]
+        path = self.reversebook.get(address)
+        if path is None:
+            raise NoResultError(f"{contract_name}: {address} is not in the flatbook")
+        return Munch.fromDict({"path": path, "address": address})
+
+    def all_versions(self, contract_name) -> list[Munch]:
+        """
+        All deployments of a contract as {path, address}, latest deployment first
+        """
+        versions = self.versions_by_contract.get(contract_name)
+        if not versions:
+            raise NoResultError(contract_name)
+        return [Munch.fromDict(version) for version in reversed(versions)]
+
+    @staticmethod
+    def latest_contract_all_chains(
+        contract_name, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> dict[str, Optional[Munch]]:
+        """
+        Finds the latest deployment of a contract on every chain
+        returns a dict with chain as keys and a dict with "path" and "address" like
+        latest_contract, the path being the one outputs/[chain]_reverse.json lists.
+        None if the contract was never deployed on that chain or is not in its book
+        """
+        versions_by_chain = versions_by_contract_by_chain()
+        latest = {}
+        for chain in AddrBook.chain_ids_by_name.keys():
+            versions = versions_by_chain.get(chain, {}).get(contract_name)
+            if versions:
+                latest[chain] = to_checksum_address(versions[-1]["address"])
+        reversebooks = map_chains(fetch_generated_reversebook, latest, max_workers)
+        result = {}
+        for chain in AddrBook.chain_ids_by_name.keys():
+            address = latest.get(chain)
+            path = (reversebooks.get(chain) or {}).get(address)
+            result[chain] = (
+                Munch.fromDict({"path": path, "address": address}) if path else None
+            )
+        return result
 
     @staticmethod
     def checksum_address_dict(addresses):
         """
         convert addresses to their checksum variant taken from a (nested) dict
         """
-        checksummed = {}
-        for k, v in addresses.items():
-            if isinstance(v, dict):
-                checksummed[k] = checksum_address_dict(v)
-            elif isinstance(v, str):
-                try:
-                    checksummed[k] = to_checksum_address(v)
-                except:
-                    checksummed[k] = v
-            else:
-                print(k, v, "formatted incorrectly")
-                checksummed[k] = v
-        return checksummed
+        return checksum_address_dict(addresses)
 
     def flatten_dict(self, d, parent_key="", sep="/"):
-        items = []
-        d = dict(d)
-        for k, v in d.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(self.flatten_dict(v, new_key, sep=sep).items())
+        """
+        Flatten a nested dict into {path: value}, walking it depth first without recursion
+        """
+        flat = {}
+        stack = [(parent_key, iter(d.items()))]
+        while stack:
+            prefix, items = stack[-1]
+            for k, v in items:
+                key = f"{prefix}{sep}{k}" if prefix else k
+                if isinstance(v, dict):
+                    stack.append((key, iter(v.items())))
+                    break
+                flat[key] = v
             else:
-                items.append((new_key, v))
-        return dict(items)
+                stack.pop()
+        return flat
+
+    def flatten_namespace(self, namespace: str) -> dict[str, str]:
+        """
+        Get the flattened paths of a single flatbook namespace, loading only its own source
+        """
+        if namespace not in self._flat_namespaces:
+            try:
+                flat = self._build_namespace(namespace)
+            except Exception as e:
+                if self.strict:
+                    raise
+                print(
+                    f"Warning: Failed to load {namespace} for chain {self.chain}: {e}"
+                )
+                flat = {}
+            self._flat_namespaces[namespace] = flat
+        return self._flat_namespaces[namespace]
+
+    def _build_namespace(self, namespace: str) -> dict[str, str]:
+        if namespace == "deployments":
+            return {
+                infodict.path: infodict.address
+                for ddata in self.deployments.values()
+                for infodict in ddata["contracts"].values()
+            }
+        if namespace == "extras":
+            return self.flatten_dict(self.extras)
+        if namespace == "EOA":
+            return self.flatten_dict(self.EOAs, namespace)
+        return self.flatten_dict(getattr(self, namespace), namespace)
+
+    def merge_namespaces(self, namespaces=FLATBOOK_NAMESPACES) -> dict[str, str]:
+        """
+        Merge flattened namespaces, later namespaces overwrite paths of earlier ones
+        """
+        merged = {}
+        for namespace in FLATBOOK_NAMESPACES:
+            if namespace in namespaces:
+                merged.update(self.flatten_namespace(namespace))
+        return merged
+
+    def _search_index(
+        self, namespaces: Optional[Iterable[str]] = None
+    ) -> tuple[dict[str, str], SubstringIndex]:
+        """
+        Get the merged namespaces (all of them, i.e. the flatbook, by default) together
+        with their path index. Raises ValueError for names not in FLATBOOK_NAMESPACES
+        """
+        if namespaces is None:
+            namespaces = FLATBOOK_NAMESPACES
+        if isinstance(namespaces, str):
+            raise ValueError(f"namespaces must be a list of names, not {namespaces!r}")
+        namespaces = set(namespaces)
+        unknown = namespaces.difference(FLATBOOK_NAMESPACES)
+        if unknown:
+            raise ValueError(
+                f"Unknown namespaces {sorted(unknown)}, expected {FLATBOOK_NAMESPACES}"
+            )
+        namespaces = tuple(n for n in FLATBOOK_NAMESPACES if n in namespaces)
+        if namespaces not in self._search_indexes:
+            book = (
+                self.flatbook
+                if namespaces == FLATBOOK_NAMESPACES
+                else self.merge_namespaces(namespaces)
+            )
+            self._search_indexes[namespaces] = (book, SubstringIndex(book))
+        return self._search_indexes[namespaces]
 
     def generate_flatbook(self):
-        flatbook = {}
-        self.populate_eoas()
-        self.populate_deployments()
-        self.populate_multisigs()
-        self.populate_pools()
-        self.populate_gauges()
-        self.populate_root_gauges()
-        self.populate_extras()
-        self.process_rate_providers()
-        # write pools and gauges first, so they get overwritten by deployments later
-        # deployment label should take precedence over pool/gauge label
-        flatbook["pools"] = self.flatten_dict(self.pools)
-        flatbook["gauges"] = self.flatten_dict(self.gauges)
-        flatbook["root_gauges"] = self.flatten_dict(self.root_gauges)
-        for deployment, ddata in self.deployments.items():
-            for contract, infodict in ddata["contracts"].items():
-                flatbook[infodict.path] = infodict.address
-        flatbook = {**flatbook, **self.flatten_dict(self.extras)}
-        flatbook["multisigs"] = self.flatten_dict(self.multisigs)
-        flatbook["EOA"] = self.flatten_dict(self.EOAs)
-        flatbook["rate_providers"] = self.flatten_dict(self.rate_providers)
-        return self.flatten_dict(flatbook)
+        return self.merge_namespaces(FLATBOOK_NAMESPACES)
 
     @staticmethod
-    def get_address_all_chains(search_string: str) -> dict[str, dict[str, str]]:
+    def get_address_all_chains(
+        search_string: str,
+        use_index: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> dict[str, dict[str, str]]:
         """
         Finds addresses for a unique name across all chains
         returns a dict with chain as keys and a dict with "path" and "address"
         Will throw MultipleMatchesError if the string is not unique on each and every chain
+        Chains are loaded in parallel on up to max_workers threads, with use_index the
+        generated outputs/[chain].json books are searched through the global name index instead
         """
-        result = {}
-        for chain in AddrBook.chain_ids_by_name.keys():
+        if use_index:
+            return AddrBook._get_address_all_chains_from_index(search_string)
+
+        def search(chain):
             print(f"Processing {chain}")
-            addr_book = AddrBook(chain)
             try:
-                info = addr_book.search_unique(search_string)
-                result[chain] = info
+                return AddrBook(chain).search_unique(search_string)
             except NoResultError:
-                result[chain] = None
-                print("Not Found")
+                print(f"Not Found on {chain}")
+                return None
+
+        return map_chains(search, AddrBook.chain_ids_by_name.keys(), max_workers)
+
+    @staticmethod
+    def reverse_lookup_all_chains(address: str) -> list[Munch]:
+        """
+        Every chain and path an address is known under, as a list of dicts with
+        "chain" and "path". Empty if the address is unknown
+        """
+        if not is_address(address):
+            return []
+        entries = global_reverse_index().get(to_checksum_address(address), [])
+        return [
+            Munch.fromDict({"chain": chain, "path": path}) for chain, path in entries
+        ]
+
+    @staticmethod
+    def _get_address_all_chains_from_index(search_string: str):
+        index, path_index = global_name_index()
+        results_by_chain = defaultdict(list)
+        for path in path_index.search(search_string):
+            for chain, address in index[path].items():
+                results_by_chain[chain].append((path, address))
+        result = {}
+        for chain in AddrBook.chain_ids_by_name.keys():
+            results = results_by_chain.get(chain, [])
+            if len(results) > 1:
+                raise MultipleMatchesError(
+                    f"{search_string} Multiple matches found on {chain}: {results}"
+                )
+            result[chain] = (
+                Munch.fromDict({"path": results[0][0], "address": results[0][1]})
+                if results
+                else None
+            )
         return result
 
 
+def index_contract_versions(deployments: dict) -> dict[str, list[dict[str, str]]]:
+    """
+    Map contract names to their {path, address} in every deployment holding them.
+    Deployment ids are date prefixed, so sorting them orders versions oldest first
+    """
+    versions = defaultdict(list)
+    for deployment in sorted(deployments):
+        for contract, address in deployments[deployment].items():
+            versions[contract].append(
+                {"path": f"{deployment}/{contract}", "address": address}
+            )
+    return dict(versions)
+
+
+def versions_by_contract_by_chain() -> dict[str, dict[str, list[dict[str, str]]]]:
+    """
+    index_contract_versions for every chain in outputs/deployments.json.
+    Built once and kept in the shared source cache alongside deployments.json
+    """
+    url = f"{GITHUB_RAW_OUTPUTS}/deployments.json"
+
+    def build():
+        deployments = get_json(url) or {}
+        active = deployments.get("active", {})
+        old = deployments.get("old", {})
+        return {
+            chain: index_contract_versions(active.get(chain, {}) | old.get(chain, {}))
+            for chain in active.keys() | old.keys()
+        }
+
+    return source_cache.get(("versions_by_contract_by_chain", url), build)
+
+
+def fetch_generated_books(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> dict[str, dict[str, str]]:
+    """
+    The generated outputs/[chain].json flatbooks of every chain, fetched in parallel
+    """
+
+    def fetch_book(chain):
+        return get_json(f"{GITHUB_RAW_OUTPUTS}/{chain}.json", f"outputs/{chain}.json")
+
+    books = map_chains(fetch_book, AddrBook.chain_ids_by_name.keys(), max_workers)
+    return {chain: book or {} for chain, book in books.items()}
+
+
+def fetch_generated_reversebook(chain) -> Optional[dict[str, str]]:
+    """
+    The generated outputs/[chain]_reverse.json book of chain, None if there is none
+    """
+    return get_json(
+        f"{GITHUB_RAW_OUTPUTS}/{chain}_reverse.json", f"outputs/{chain}_reverse.json"
+    )
+
+
+def prefetch_sources(chains, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    """
+    Download every source read by the AddrBooks of chains into the source cache, each once
+    """
+    sources = list(
+        dict.fromkeys(source for chain in chains for source in AddrBook.sources(chain))
+    )
+
+    def load(source):
+        try:
+            get_json(*source)
+        except Exception as e:
+            # the namespace reading it will fetch it again, and warn or raise then
+            print(f"Warning: Failed to fetch {source[0]}: {e!r}")
+
+    map_chains(load, sources, max_workers)
+
+
+def build_flatbooks(
+    chains, max_workers: int = DEFAULT_MAX_WORKERS, strict: bool = True
+) -> tuple[dict[str, dict[str, str]], dict[str, Exception]]:
+    """
+    Flatbooks of several chains in one pass, as ({chain: flatbook}, {chain: exception}).
+    Every source of every chain is downloaded once up front and held in the source cache
+    until all books are built, each book then picks its chain out of the shared data.
+    Unless strict is unset, a chain with a namespace that failed to load is reported in
+    the exceptions instead of coming back with that namespace missing.
+    """
+    chains = list(chains)
+    with source_cache.hold():
+        prefetch_sources(chains, max_workers)
+        return map_chains_isolated(
+            lambda chain: AddrBook(chain, strict=strict).flatbook, chains, max_workers
+        )
+
+
+def global_name_index(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> tuple[dict[str, dict[str, str]], SubstringIndex]:
+    """
+    Index of the generated outputs/[chain].json books as {path: {chain: address}},
+    together with a substring index over its paths.
+    Built once and kept in the shared source cache
+    """
+
+    def build():
+        index = defaultdict(dict)
+        for chain, book in fetch_generated_books(max_workers).items():
+            for path, address in book.items():
+                index[path][chain] = address
+        index = dict(index)
+        return index, SubstringIndex(index)
+
+    return source_cache.get(("global_name_index", GITHUB_RAW_OUTPUTS), build)
+
+
+def build_global_reverse_index(
+    books: dict[str, dict[str, str]]
+) -> dict[str, list[list[str]]]:
+    """
+    Map every address to all [chain, path] pairs it shows up under in books,
+    ordered by address and then by chain and path. Values that are not addresses are
+    left out
+    """
+    index = defaultdict(list)
+    for chain, book in books.items():
+        for path, address in book.items():
+            if is_address(address):
+                index[checksum_if_address(address)].append([chain, path])
+    return {address: sorted(index[address]) for address in sorted(index)}
+
+
+def global_reverse_index(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> dict[str, list[list[str]]]:
+    """
+    Cross chain reverse index {address: [[chain, path], ...]}.
+    Read from the precomputed outputs/reverse_index.json, built from the generated books
+    if that is not available. Kept in the shared source cache
+    """
+    url = f"{GITHUB_RAW_OUTPUTS}/reverse_index.json"
+
+    def build():
+        index = get_json(url, "outputs/reverse_index.json")
+        if index is None:
+            index = build_global_reverse_index(fetch_generated_books(max_workers))
+        return index
+
+    return source_cache.get(("global_reverse_index", url), build)
+
+
 # Version outside class to allow for recursion on the uninitialized class
 def checksum_address_dict(addresses):
     """
@@ -417,10 +787,7 @@ def checksum_address_dict(addresses):
         if isinstance(v, dict):
             checksummed[k] = checksum_address_dict(v)
         elif isinstance(v, str):
-            try:
-                checksummed[k] = to_checksum_address(v)
-            except:
-                checksummed[k] = v
+            checksummed[k] = checksum_if_address(v)
         else:
             print(k, v, "formatted incorrectly")
             checksummed[k] = v
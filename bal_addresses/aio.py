@@ -0,0 +1,215 @@
+import asyncio
+import os.path
+from typing import Iterable, Optional
+
+from munch import Munch
+
+from .addresses import AddrBook
+from .cache import source_cache
+from .permissions import BalPermissions
+
+
+DEFAULT_CONNECTION_LIMIT = 16
+
+
+def new_session(limit: int = DEFAULT_CONNECTION_LIMIT) -> "aiohttp.ClientSession":
+    """
+    Pooled aiohttp session shared by all downloads of a load
+    """
+    try:
+        # optional, imported here to keep it out of `import bal_addresses`
+        import aiohttp
+    except ImportError:
+        raise ImportError(
+            "The async API needs aiohttp, install it with `pip install bal_addresses[async]`"
+        )
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit))
+
+
+async def _fetch_json(session: "aiohttp.ClientSession", url: str):
+    async with session.get(url) as response:
+        if response.status == 404:
+            return None
+        # anything else is left out of the cache by prefetch
+        response.raise_for_status()
+        # raw.githubusercontent.com serves json as text/plain
+        return await response.json(content_type=None)
+
+
+async def prefetch(
+    sources: Iterable[tuple[str, Optional[str]]],
+    session: Optional["aiohttp.ClientSession"] = None,
+) -> None:
+    """
+    Concurrently download every (url, local_path) source that is neither cached nor
+    available locally into the shared source cache
+    """
+    pending = sorted(
+        {
+            url
+            for url, local_path in sources
+            if not (local_path and os.path.exists(local_path))
+            and url not in source_cache
+        }
+    )
+    if not pending:
+        return
+    if session is None:
+        async with new_session() as session:
+            return await prefetch(sources, session)
+    results = await asyncio.gather(
+        *(_fetch_json(session, url) for url in pending), return_exceptions=True
+    )
+    for url, result in zip(pending, results):
+        if isinstance(result, Exception):
+            # left out of the cache, the book falls back to a (threaded) blocking fetch
+            print(f"Warning: Failed to fetch {url}: {result!r}")
+            continue
+        source_cache.set(url, result)
+
+
+class AsyncAddrBook:
+    """
+    asyncio counterpart of AddrBook.
+    All sources are downloaded concurrently, the book is then built off the event loop
+    and every lookup below is answered from memory.
+    """
+
+    def __init__(self, book: AddrBook):
+        self.book = book
+        self.chain = book.chain
+
+    @staticmethod
+    def _build(chain) -> AddrBook:
+        book = AddrBook(chain)
+        # load every namespace now, while we are off the event loop
+        book.flatbook
+        return book
+
+    @classmethod
+    async def load(
+        cls, chain, session: Optional["aiohttp.ClientSession"] = None
+    ) -> "AsyncAddrBook":
+        await prefetch(AddrBook.sources(chain), session)
+        return cls(await asyncio.to_thread(cls._build, chain))
+
+    @classmethod
+    async def load_many(
+        cls, chains: Iterable[str], session: Optional["aiohttp.ClientSession"] = None
+    ) -> dict[str, "AsyncAddrBook"]:
+        """
+        Load books for several chains, sources shared between chains are downloaded once
+        """
+        chains = list(chains)
+        await prefetch(
+            [source for chain in chains for source in AddrBook.sources(chain)], session
+        )
+        books = await asyncio.gather(
+            *(asyncio.to_thread(cls._build, chain) for chain in chains)
+        )
+        return {chain: cls(book) for chain, book in zip(chains, books)}
+
+    @property
+    def flatbook(self) -> dict[str, str]:
+        return self.book.flatbook
+
+    @property
+    def reversebook(self) -> dict[str, str]:
+        return self.book.reversebook
+
+    @property
+    def deployments_only(self) -> Munch:
+        return self.book.deployments_only
+
+    def search_unique(self, substr, namespaces=None) -> Munch:
+        return self.book.search_unique(substr, namespaces)
+
+    def search_many(self, substr, namespaces=None) -> list[Munch]:
+        return self.book.search_many(substr, namespaces)
+
+    def search_unique_deployment(self, substr) -> Munch:
+        return self.book.search_unique_deployment(substr)
+
+    def search_many_deployments(self, substr) -> list[str]:
+        return self.book.search_many_deployments(substr)
+
+    def latest_contract(self, contract_name) -> Munch:
+        return self.book.latest_contract(contract_name)
+
+    def all_versions(self, contract_name) -> list[Munch]:
+        return self.book.all_versions(contract_name)
+
+
+class AsyncBalPermissions:
+    """
+    asyncio counterpart of BalPermissions.
+    Lookups on the permission data are answered from memory, helpers that need an
+    address book are coroutines running off the event loop.
+    """
+
+    def __init__(self, permissions: BalPermissions):
+        self.permissions = permissions
+        self.chain = permissions.chain
+
+    @classmethod
+    async def load(
+        cls,
+        chain,
+        session: Optional["aiohttp.ClientSession"] = None,
+        addr_book: Optional[AsyncAddrBook] = None,
+    ) -> "AsyncBalPermissions":
+        """
+        Pass the AsyncAddrBook of chain as addr_book if one is loaded already
+        """
+        await prefetch(BalPermissions.sources(chain), session)
+        book = addr_book.book if addr_book else None
+        return cls(await asyncio.to_thread(BalPermissions, chain, book))
+
+    @classmethod
+    async def load_many(
+        cls, chains: Iterable[str], session: Optional["aiohttp.ClientSession"] = None
+    ) -> dict[str, "AsyncBalPermissions"]:
+        chains = list(chains)
+        await prefetch(
+            [source for chain in chains for source in BalPermissions.sources(chain)],
+            session,
+        )
+        permissions = await asyncio.gather(
+            *(asyncio.to_thread(BalPermissions, chain) for chain in chains)
+        )
+        return {chain: cls(p) for chain, p in zip(chains, permissions)}
+
+    def allowed_addresses(self, action_id) -> list[str]:
+        return self.permissions.allowed_addresses(action_id)
+
+    def search_path(self, substr) -> list[str]:
+        return self.permissions.search_path(substr)
+
+    def needs_authorizer(self, contract, deployment) -> bool:
+        return self.permissions.needs_authorizer(contract, deployment)
+
+    async def allowed_caller_names(self, action_id) -> list[str]:
+        return await asyncio.to_thread(self.permissions.allowed_caller_names, action_id)
+
+    async def allowed_caller_names_many(self, action_ids) -> dict[str, list[str]]:
+        return await asyncio.to_thread(
+            self.permissions.allowed_caller_names_many, action_ids
+        )
+
+    async def search_many_paths_by_unique_deployment(
+        self, deployment_substr, fx_substr
+    ) -> list[dict[str, str]]:
+        return await asyncio.to_thread(
+            self.permissions.search_many_paths_by_unique_deployment,
+            deployment_substr,
+            fx_substr,
+        )
+
+    async def search_unique_path_by_unique_deployment(
+        self, deployment_substr, fx_substr
+    ) -> dict[str, str]:
+        return await asyncio.to_thread(
+            self.permissions.search_unique_path_by_unique_deployment,
+            deployment_substr,
+            fx_substr,
+        )
@@ -0,0 +1,236 @@
+import bisect
+import mmap
+import os
+import struct
+import time
+from typing import Iterator, Optional
+
+import requests
+
+from .addresses import GITHUB_RAW_OUTPUTS
+from .manifest import fetch_manifest, hash_file
+from .utils import to_checksum_address
+
+
+# Layout of a binary address book, all integers little endian:
+#   header     magic, number of names, number of addresses, size of the string pool
+#   addresses  20 byte addresses, sorted
+#   reverse    u32 per address: index of its name, the one {chain}_reverse.json lists
+#   names      (u32 offset, u32 length, u32 address index) per name, sorted by name
+#   pool       utf-8 names, each stored once and referenced by offset
+MAGIC = b"BALBOOK\x01"
+HEADER = struct.Struct("<8sIII")
+ADDRESS_SIZE = 20
+REVERSE = struct.Struct("<I")
+NAME = struct.Struct("<III")
+BINARY_SUFFIX = ".addrbook"
+BINARY_CACHE_DIR = os.getenv(
+    "BAL_ADDRESSES_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bal_addresses"),
+)
+# seconds a cached binary book is used before it is checked against the manifest again
+BINARY_MAX_AGE = float(os.getenv("BAL_ADDRESSES_BINARY_MAX_AGE", 60 * 60))
+
+
+def _address_bytes(address: str) -> Optional[bytes]:
+    if (
+        not isinstance(address, str)
+        or len(address) != 42
+        or address[:2].lower() != "0x"
+    ):
+        return None
+    try:
+        return bytes.fromhex(address[2:])
+    except ValueError:
+        return None
+
+
+def pack_addrbook(
+    flatbook: dict[str, str], reversebook: Optional[dict[str, str]] = None
+) -> bytes:
+    """
+    Binary address book of {name: address}. The name returned for an address with
+    several names is the one in reversebook, by default the last one in flatbook.
+    Names whose value is not an address are left out
+    """
+    keys = {}
+    for name, address in flatbook.items():
+        key = _address_bytes(address)
+        if key is not None:
+            keys[name] = key
+    names = sorted(keys, key=lambda name: name.encode())
+    name_index = {name: i for i, name in enumerate(names)}
+    addresses = sorted(set(keys.values()))
+    address_index = {address: i for i, address in enumerate(addresses)}
+    reverse = {key: name for name, key in keys.items()}
+    for address, name in (reversebook or {}).items():
+        key = _address_bytes(address)
+        if key in reverse and name in keys:
+            reverse[key] = name
+
+    pool = bytearray()
+    entries = bytearray()
+    for name in names:
+        encoded = name.encode()
+        address = address_index[keys[name]]
+        entries += NAME.pack(len(pool), len(encoded), address)
+        pool += encoded
+    return b"".join(
+        [
+            HEADER.pack(MAGIC, len(names), len(addresses), len(pool)),
+            *addresses,
+            *(REVERSE.pack(name_index[reverse[address]]) for address in addresses),
+            bytes(entries),
+            bytes(pool),
+        ]
+    )
+
+
+def binary_addrbook_path(chain: str, max_age: float = BINARY_MAX_AGE) -> str:
+    """
+    Path of the binary book of chain: outputs/ when running from a checkout of this repo,
+    else a copy in BINARY_CACHE_DIR. A copy older than max_age seconds is downloaded again
+    if the published manifest lists a different hash. A cached copy is used as is when
+    the manifest or the new book cannot be fetched
+    """
+    name = f"{chain}{BINARY_SUFFIX}"
+    local_path = os.path.join("outputs", name)
+    if os.path.exists(local_path):
+        return local_path
+    path = os.path.join(BINARY_CACHE_DIR, name)
+    cached = os.path.exists(path)
+    if cached and time.time() - os.path.getmtime(path) < max_age:
+        return path
+    try:
+        if cached:
+            expected = fetch_manifest().get(name, {}).get("sha256")
+            if expected in (None, hash_file(path)):
+                # still current, not checked again for another max_age
+                os.utime(path)
+                return path
+        response = requests.get(f"{GITHUB_RAW_OUTPUTS}/{name}")
+        response.raise_for_status()
+    except Exception as e:
+        if not cached:
+            raise
+        print(
+            f"Warning: Could not check {name} for updates, using the cached copy: {e}"
+        )
+        return path
+    os.makedirs(BINARY_CACHE_DIR, exist_ok=True)
+    # replaced atomically, processes that have the old copy mapped keep reading it
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(response.content)
+    os.replace(tmp_path, path)
+    return path
+
+
+class _Column:
+    """
+    Sequence view over the sorted keys of a section, for bisect
+    """
+
+    def __init__(self, length, key):
+        self.length = length
+        self.key = key
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i) -> bytes:
+        return self.key(i)
+
+
+class BinaryAddrBook:
+    """
+    Read only {name: address} book of one chain, memory mapped from a file written by
+    pack_addrbook. Lookups binary search the mapped file instead of parsing json, and
+    every process that opens the same file shares its pages.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._name_count, self._address_count, pool_size = HEADER.unpack_from(
+            self._mmap
+        )
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a binary address book")
+        self._addresses_at = HEADER.size
+        self._reverse_at = self._addresses_at + ADDRESS_SIZE * self._address_count
+        self._names_at = self._reverse_at + REVERSE.size * self._address_count
+        self._pool_at = self._names_at + NAME.size * self._name_count
+        if len(self._mmap) != self._pool_at + pool_size:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated")
+        self._addresses = _Column(self._address_count, self._address)
+        self._names = _Column(self._name_count, self._name)
+
+    @classmethod
+    def load(cls, chain: str) -> "BinaryAddrBook":
+        return cls(binary_addrbook_path(chain))
+
+    def _address(self, i: int) -> bytes:
+        start = self._addresses_at + ADDRESS_SIZE * i
+        return self._mmap[start : start + ADDRESS_SIZE]
+
+    def _entry(self, i: int) -> tuple[int, int, int]:
+        return NAME.unpack_from(self._mmap, self._names_at + NAME.size * i)
+
+    def _name(self, i: int) -> bytes:
+        offset, length, _ = self._entry(i)
+        start = self._pool_at + offset
+        return self._mmap[start : start + length]
+
+    def _find(self, column: _Column, key: bytes) -> Optional[int]:
+        i = bisect.bisect_left(column, key)
+        if i < len(column) and column[i] == key:
+            return i
+        return None
+
+    def address(self, name: str) -> Optional[str]:
+        """
+        Checksummed address of name, None if unknown
+        """
+        i = self._find(self._names, name.encode())
+        if i is None:
+            return None
+        return to_checksum_address("0x" + self._address(self._entry(i)[2]).hex())
+
+    def name(self, address: str) -> Optional[str]:
+        """
+        Name of address, None if unknown
+        """
+        key = _address_bytes(address)
+        i = None if key is None else self._find(self._addresses, key)
+        if i is None:
+            return None
+        (name,) = REVERSE.unpack_from(self._mmap, self._reverse_at + REVERSE.size * i)
+        return self._name(name).decode()
+
+    def __len__(self) -> int:
+        return self._name_count
+
+    def __contains__(self, name: str) -> bool:
+        return self._find(self._names, name.encode()) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._name_count):
+            yield self._name(i).decode()
+
+    def items(self) -> Iterator[tuple[str, str]]:
+        for i in range(self._name_count):
+            address = self._address(self._entry(i)[2])
+            yield self._name(i).decode(), to_checksum_address("0x" + address.hex())
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "BinaryAddrBook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
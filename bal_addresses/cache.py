@@ -0,0 +1,150 @@
+import json
+import os.path
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+import requests
+
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAXSIZE = 64
+
+_MISSING = object()
+
+
+class SourceCache:
+    """
+    Thread safe cache of parsed source data keyed by URL (or local path).
+    Entries expire after `ttl` seconds and the least recently used entry is evicted
+    once more than `maxsize` entries are held.
+    Concurrent requests for the same key only run the loader once.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, maxsize: int = DEFAULT_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self._holds = 0
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return self._lookup(key) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _lookup(self, key) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic() and not self._holds:
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader to produce it on a miss
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    self.hits += 1
+                    return value
+                self.misses += 1
+            try:
+                value = loader()
+                self.set(key, value)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self) -> None:
+        if self._holds:
+            return
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    @contextmanager
+    def hold(self):
+        """
+        Keep every entry, regardless of ttl and maxsize, until the block exits.
+        For batch jobs that must not download a source twice
+        """
+        with self._lock:
+            self._holds += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._holds -= 1
+                self._evict()
+
+    def clear(self) -> None:
+        """
+        Drop all entries and reset the hit/miss counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+# Shared by every AddrBook, BalPermissions and RateProviders instance in the process
+source_cache = SourceCache()
+
+
+def fetch_json(url: str) -> Optional[Any]:
+    """
+    Download and parse a json document, returns None if it does not exist.
+    Any other error is raised, so it is not cached and the next access tries again
+    """
+    response = requests.get(url)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+def get_json(url: str, local_path: Optional[str] = None) -> Optional[Any]:
+    """
+    Get a parsed json source through the shared cache.
+    If local_path exists (i.e. running from a checkout of this repo) it is read instead of url.
+    Returns None if the source could not be found, raises if it could not be fetched.
+    Cached values are shared, callers must copy before mutating them.
+    """
+    if local_path and os.path.exists(local_path):
+        return source_cache.get(local_path, lambda: json.load(open(local_path)))
+    return source_cache.get(url, lambda: fetch_json(url))
@@ -0,0 +1,65 @@
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+
+DEFAULT_MAX_WORKERS = int(os.getenv("BAL_ADDRESSES_MAX_WORKERS", 8))
+
+
+def map_chains(
+    fn: Callable[[str], Any],
+    chains: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> dict[str, Any]:
+    """
+    Run fn(chain) for every chain on a bounded thread pool.
+    Returns {chain: result} in the order of chains, the first exception in that order is raised
+    """
+    chains = list(chains)
+    if not chains:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chains))) as executor:
+        futures = [executor.submit(fn, chain) for chain in chains]
+        return {chain: future.result() for chain, future in zip(chains, futures)}
+
+
+def map_chains_isolated(
+    fn: Callable[[str], Any],
+    chains: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> tuple[dict[str, Any], dict[str, Exception]]:
+    """
+    Like map_chains, but a chain that raises does not affect the others.
+    Returns ({chain: result}, {chain: exception}), both in the order of chains.
+    Every failure is printed with its traceback.
+    """
+
+    def run(chain):
+        try:
+            return fn(chain), None
+        except Exception as e:
+            print(f"ERROR: {chain} failed:\n{traceback.format_exc()}")
+            return None, e
+
+    results = {}
+    failures = {}
+    for chain, (result, error) in map_chains(run, chains, max_workers).items():
+        if error is None:
+            results[chain] = result
+        else:
+            failures[chain] = error
+    return results, failures
+
+
+def report_failures(failures: dict[str, Exception]) -> None:
+    """
+    Print a summary of the chains map_chains_isolated could not process
+    """
+    if not failures:
+        return
+    print(
+        f"\nWARNING: {len(failures)} chain(s) failed and kept their previous outputs:"
+    )
+    for chain, error in failures.items():
+        print(f"  - {chain}: {error!r}")
@@ -0,0 +1,44 @@
+import os.path
+from collections import Counter, defaultdict
+from typing import Iterable
+
+
+def unique_labels(
+    names: Iterable[str],
+    addresses: Iterable[str],
+    separator: str = "-",
+    min_length: int = 4,
+    extend: bool = True,
+) -> list[str]:
+    """
+    Label every name as name + separator + the first hex characters of its address.
+    All entries of a name whose labels collide share one suffix length: the shortest
+    (but at least min_length) that tells their addresses apart, i.e. one more than the
+    longest common prefix of two neighbouring addresses in sorted order.
+    With extend=False every label uses min_length and collisions are left to the caller.
+    Labels are returned in the order of names.
+    """
+    names = list(names)
+    addresses = list(addresses)
+    labels = [
+        name + separator + address[2 : 2 + min_length]
+        for name, address in zip(names, addresses)
+    ]
+    if not extend:
+        return labels
+    counts = Counter(labels)
+    # a label is name + separator + min_length characters, so only equal names collide
+    colliding = {name for name, label in zip(names, labels) if counts[label] > 1}
+    groups = defaultdict(list)
+    for i, name in enumerate(names):
+        if name in colliding:
+            groups[name].append(i)
+    for name, indexes in groups.items():
+        hexes = sorted(addresses[i][2:] for i in indexes)
+        longest = max(
+            len(os.path.commonprefix([a, b])) for a, b in zip(hexes, hexes[1:])
+        )
+        length = max(min_length, longest + 1)
+        for i in indexes:
+            labels[i] = name + separator + addresses[i][2 : 2 + length]
+    return labels
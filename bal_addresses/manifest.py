@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os.path
+import threading
+from typing import Any, Iterable, Optional
+
+from .addresses import GITHUB_RAW_OUTPUTS
+from .cache import get_json
+
+
+MANIFEST_PATH = "outputs/manifest.json"
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_json(data: Any) -> str:
+    """
+    Hash of a parsed json document, independent of key order and formatting
+    """
+    return hash_bytes(json.dumps(data, sort_keys=True, separators=(",", ":")).encode())
+
+
+def hash_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hash_bytes(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def hash_files(paths: Iterable[str]) -> str:
+    """
+    Combined hash of the names and contents of several files
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode())
+        digest.update(hash_file(path).encode())
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Content hashes of the generated outputs, kept in outputs/manifest.json as
+    {name: {"sha256": hash of the file, "inputs": combined hash of its {input: hash}}}.
+    Outputs written without inputs have no "inputs" and are never current.
+    Names are relative to the directory of the manifest, i.e. the path below GITHUB_RAW_OUTPUTS.
+    Generators use it to skip outputs whose inputs did not change, clients to find out
+    which outputs changed since they last fetched them.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self.root = os.path.dirname(path)
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        self._lock = threading.Lock()
+
+    def name(self, path: str) -> str:
+        return os.path.relpath(path, self.root)
+
+    def is_current(self, path: str, inputs: dict[str, str]) -> bool:
+        """
+        Whether path was generated from exactly these inputs and not touched since
+        """
+        with self._lock:
+            entry = self.entries.get(self.name(path))
+        return (
+            entry is not None
+            and entry.get("inputs") == hash_json(inputs)
+            and hash_file(path) == entry["sha256"]
+        )
+
+    def write_json(
+        self, path: str, data: Any, inputs: Optional[dict[str, str]] = None, **kwargs
+    ) -> bool:
+        """
+        Write data as indented json and record it. The file is left alone if it already
+        holds exactly this content. Returns whether the file was written
+        """
+        content = json.dumps(data, indent=2, **kwargs) + "\n"
+        return self.write_bytes(path, content.encode(), inputs)
+
+    def write_bytes(
+        self, path: str, content: bytes, inputs: Optional[dict[str, str]] = None
+    ) -> bool:
+        """
+        Write content and record it, like write_json
+        """
+        sha256 = hash_bytes(content)
+        written = hash_file(path) != sha256
+        if written:
+            with open(path, "wb") as f:
+                f.write(content)
+        entry = {"sha256": sha256}
+        if inputs is not None:
+            entry["inputs"] = hash_json(inputs)
+        with self._lock:
+            self.entries[self.name(path)] = entry
+        return written
+
+    def save(self) -> None:
+        with self._lock:
+            entries = dict(sorted(self.entries.items()))
+        with open(self.path, "w") as f:
+            json.dump(entries, f, indent=2)
+            f.write("\n")
+
+
+def fetch_manifest() -> dict[str, dict]:
+    """
+    The published manifest, {} if there is none
+    """
+    return get_json(f"{GITHUB_RAW_OUTPUTS}/manifest.json", MANIFEST_PATH) or {}
+
+
+def changed_outputs(
+    known: dict[str, str], manifest: Optional[dict[str, dict]] = None
+) -> list[str]:
+    """
+    Names of the published outputs whose hash differs from known {name: sha256},
+    including outputs missing from known
+    """
+    if manifest is None:
+        manifest = fetch_manifest()
+    return [
+        name for name, entry in manifest.items() if known.get(name) != entry["sha256"]
+    ]
@@ -0,0 +1,113 @@
+from typing import Any, Iterable
+
+from eth_utils import to_checksum_address
+from eth_utils.abi import collapse_if_tuple
+
+
+# Multicall3 is deployed at the same address on every chain that has it
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    }
+]
+DEFAULT_CHUNK_SIZE = 500
+
+
+class Multicall:
+    """
+    Batches read only contract calls into Multicall3 aggregate3 calls of chunk_size.
+    Chains without Multicall3 get one eth_call per call instead.
+    Results come back as `ContractFunction.call()` would return them, in call order.
+    """
+
+    def __init__(
+        self,
+        w3,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        address: str = MULTICALL3_ADDRESS,
+    ):
+        self.w3 = w3
+        self.chunk_size = chunk_size
+        self.contract = w3.eth.contract(address=address, abi=MULTICALL3_ABI)
+        self._available = None
+
+    @property
+    def available(self) -> bool:
+        """
+        Whether Multicall3 is deployed on the chain of w3, checked once
+        """
+        if self._available is None:
+            try:
+                self._available = len(self.w3.eth.get_code(self.contract.address)) > 0
+            except Exception as e:
+                print(f"WARNING: Could not check for Multicall3: {e}")
+                self._available = False
+        return self._available
+
+    def call(self, calls: Iterable, block_identifier="latest") -> list[Any]:
+        calls = list(calls)
+        if not self.available:
+            return [fn.call(block_identifier=block_identifier) for fn in calls]
+        results = []
+        for start in range(0, len(calls), self.chunk_size):
+            chunk = calls[start : start + self.chunk_size]
+            results.extend(self._aggregate(chunk, block_identifier))
+        return results
+
+    def _aggregate(self, calls: list, block_identifier) -> list[Any]:
+        batch = [(fn.address, True, fn._encode_transaction_data()) for fn in calls]
+        try:
+            returned = self.contract.functions.aggregate3(batch).call(
+                block_identifier=block_identifier
+            )
+        except Exception as e:
+            print(
+                f"WARNING: aggregate3 of {len(calls)} calls failed, retrying one by one: {e}"
+            )
+            return [fn.call(block_identifier=block_identifier) for fn in calls]
+        results = []
+        for fn, (success, data) in zip(calls, returned):
+            if not success:
+                # repeated on its own so the revert surfaces as it would unbatched
+                results.append(fn.call(block_identifier=block_identifier))
+                continue
+            results.append(self._decode(fn, data))
+        return results
+
+    def _decode(self, fn, data: bytes) -> Any:
+        types = [collapse_if_tuple(output) for output in fn.abi["outputs"]]
+        # ABICodec.decode was decode_abi before web3 6
+        decode = getattr(self.w3.codec, "decode", None) or self.w3.codec.decode_abi
+        values = [
+            to_checksum_address(value) if type_str == "address" else value
+            for type_str, value in zip(types, decode(types, data))
+        ]
+        if len(values) == 1:
+            return values[0]
+        return values
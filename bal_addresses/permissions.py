@@ -1,24 +1,27 @@
 from .errors import NoResultError, MultipleMatchesError
-import requests
 from .addresses import AddrBook, GITHUB_DEPLOYMENTS_RAW, GITHUB_RAW_OUTPUTS
+from .cache import get_json
+from .search import SubstringIndex
 from collections import defaultdict
 from munch import Munch
 
 
 ### Main class
 class BalPermissions:
-    def __init__(self, chain):
+    def __init__(self, chain, addr_book: AddrBook = None):
+        """
+        addr_book is used to name deployments and callers, it is loaded on first use
+        if not given. Pass one in to share it with other users of the same chain.
+        """
         self.chain = chain
+        self._addr_book = addr_book
+        permissions_url, action_ids_url = (url for url, _ in self.sources(chain))
         try:
-            self.active_permissions_by_action_id = requests.get(
-                f"{GITHUB_RAW_OUTPUTS}/permissions/active/{chain}.json"
-            ).json()
+            self.active_permissions_by_action_id = get_json(permissions_url) or {}
         except:
             self.active_permissions_by_action_id = {}
         try:
-            self.action_ids_by_contract_by_deployment = requests.get(
-                f"{GITHUB_DEPLOYMENTS_RAW}/action-ids/{chain}/action-ids.json"
-            ).json()
+            self.action_ids_by_contract_by_deployment = get_json(action_ids_url) or {}
         except:
             self.action_ids_by_contract_by_deployment = {}
 
@@ -28,15 +31,23 @@ class BalPermissions:
         self.contracts_by_fx = defaultdict(set)
         self.contracts_by_deployment = defaultdict(set)
         self.action_id_by_path = {}
+        self.action_id_by_fx_by_contract_by_deployment = {}
+        self.paths_by_deployment = defaultdict(list)
+        self.paths_by_fx = defaultdict(list)
+        self._path_index = None
+        self._deployment_index = None
         # Populate
         for deployment, contracts in self.action_ids_by_contract_by_deployment.items():
             for contract, contract_data in contracts.items():
                 for fx, action_id in contract_data["actionIds"].items():
                     path = f"{deployment}/{contract}/{fx}"
-                    assert (
-                        path not in self.action_id_by_path.values()
-                    ), f"{path} shows up twice?"
+                    assert path not in self.action_id_by_path, f"{path} shows up twice?"
                     self.action_id_by_path[path] = action_id
+                    self.action_id_by_fx_by_contract_by_deployment.setdefault(
+                        deployment, {}
+                    ).setdefault(contract, {})[fx] = action_id
+                    self.paths_by_deployment[deployment].append(path)
+                    self.paths_by_fx[fx].append(path)
                     self.deployments_by_fx[fx].add(deployment)
                     self.contracts_by_fx[fx].add(contract)
                     self.contracts_by_deployment[deployment].add(contract)
@@ -45,24 +56,69 @@ class BalPermissions:
             "0x0000000000000000000000000000000000000000000000000000000000000000"
         ].add("DEFAULT_ADMIN_ROLE")
 
+    @property
+    def addr_book(self) -> AddrBook:
+        if self._addr_book is None:
+            self._addr_book = AddrBook(self.chain)
+        return self._addr_book
+
+    @property
+    def path_index(self) -> SubstringIndex:
+        """
+        Substring index over all action id paths, built on first search
+        """
+        if self._path_index is None:
+            self._path_index = SubstringIndex(self.action_id_by_path)
+        return self._path_index
+
+    @property
+    def deployment_index(self) -> SubstringIndex:
+        """
+        Substring index over the deployments that have action ids
+        """
+        if self._deployment_index is None:
+            self._deployment_index = SubstringIndex(self.paths_by_deployment)
+        return self._deployment_index
+
+    @staticmethod
+    def sources(chain) -> list[tuple[str, None]]:
+        """
+        (url, local_path) of the active permissions and action ids read for chain
+        """
+        return [
+            (f"{GITHUB_RAW_OUTPUTS}/permissions/active/{chain}.json", None),
+            (f"{GITHUB_DEPLOYMENTS_RAW}/action-ids/{chain}/action-ids.json", None),
+        ]
+
     def search_path(self, substr) -> list[str]:
-        search = [s for s in self.action_id_by_path.keys() if substr in s]
+        search = self.path_index.search(substr)
         results = [path for path in search if path in self.action_id_by_path]
         return results
 
     def search_many_paths_by_unique_deployment(
         self, deployment_substr, fx_substr
     ) -> list[dict[str, str]]:
-        a = AddrBook(self.chain)
         results = []
-        deployment = a.search_unique_deployment(deployment_substr)
-        deployment_fxs = self.search_path(deployment.deployment)
-        search = [s for s in deployment_fxs if fx_substr in s]
-        for r in search:
-            result = Munch.fromDict({"path": r, "action_id": self.action_id_by_path[r]})
-            results.append(result)
+        deployment = self.addr_book.search_unique_deployment(deployment_substr)
+        # deployment names are date prefixed, so a path contains the name only if its
+        # deployment does; walk those deployments rather than every path
+        for d in self.deployment_index.search(deployment.deployment):
+            for path in self.paths_by_deployment[d]:
+                if fx_substr in path:
+                    result = Munch.fromDict(
+                        {"path": path, "action_id": self.action_id_by_path[path]}
+                    )
+                    results.append(result)
         return Munch.fromDict(results)
 
+    def action_id(self, deployment, contract, fx) -> str:
+        try:
+            return self.action_id_by_fx_by_contract_by_deployment[deployment][contract][
+                fx
+            ]
+        except KeyError:
+            raise NoResultError(f"{deployment}/{contract}/{fx}")
+
     def search_unique_path_by_unique_deployment(
         self, deployment_substr, fx_substr
     ) -> dict[str, str]:
@@ -87,10 +143,24 @@ class BalPermissions:
             raise NoResultError(f"{action_id} has no authorized callers")
 
     def allowed_caller_names(self, action_id) -> list[str]:
-        a = AddrBook(self.chain)
         try:
             addresslist = self.active_permissions_by_action_id[action_id]
         except KeyError:
             raise NoResultError(f"{action_id} has no authorized callers")
-        names = [a.flatbook.get(item, "undef") for item in addresslist]
+        reversebook = self.addr_book.reversebook
+        names = [reversebook.get(item, "undef") for item in addresslist]
         return names
+
+    def allowed_caller_names_many(self, action_ids) -> dict[str, list[str]]:
+        """
+        Caller names of several action ids at once, as {action_id: [names]}.
+        Action ids without authorized callers map to an empty list.
+        """
+        reversebook = self.addr_book.reversebook
+        return {
+            action_id: [
+                reversebook.get(item, "undef")
+                for item in self.active_permissions_by_action_id.get(action_id, [])
+            ]
+            for action_id in action_ids
+        }
@@ -3,11 +3,11 @@ import os.path
 from .errors import MultipleMatchesError, NoResultError
 from typing import Dict
 from typing import Optional
-import requests
 from munch import Munch
 from web3 import Web3
 
-from .utils import to_checksum_address
+from .cache import get_json
+from .utils import to_checksum_address, class_property
 
 
 GITHUB_CODEREVIEW_RAW = "https://raw.githubusercontent.com/balancer/code-review/main"
@@ -16,19 +16,31 @@ GITHUB_CODEREVIEW_NICE = "https://github.com/balancer/code-review/blob/main"
 
 class RateProviders:
 
-    source_data = requests.get(
-        f"{GITHUB_CODEREVIEW_RAW}/rate-providers/registry.json"
-    ).json()
-    SUPPORTED_CHAINS = source_data.keys()
+    @class_property
+    def source_data(cls) -> dict:
+        """
+        The registry, read through the shared cache so a failed fetch is retried.
+        Raises if it could not be fetched
+        """
+        return get_json(cls.source_url()) or {}
+
+    @class_property
+    def SUPPORTED_CHAINS(cls):
+        return cls.source_data.keys()
+
+    @staticmethod
+    def source_url() -> str:
+        return f"{GITHUB_CODEREVIEW_RAW}/rate-providers/registry.json"
 
     def __init__(self, chain):
         self.chain = "ethereum" if chain == "mainnet" else chain
-        if self.chain not in self.SUPPORTED_CHAINS:
+        source_data = self.source_data
+        if self.chain not in source_data:
             print(f"WARNING: Chain {self.chain} has no reviewed rate providers")
             self.info_by_rate_provider = {}
             self.rate_providers_by_token = {}
         else:
-            self.info_by_rate_provider = Munch(self.source_data.get(self.chain, {}))
+            self.info_by_rate_provider = Munch(source_data.get(self.chain, {}))
             self.rate_providers_by_token = Munch(
                 self.translate_source_data(self.info_by_rate_provider)
             )
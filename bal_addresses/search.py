@@ -0,0 +1,51 @@
+from collections import defaultdict
+from typing import Iterable
+
+
+class SubstringIndex:
+    """
+    Trigram inverted index answering `substr in key` queries over a fixed set of keys.
+    Candidates are found by intersecting the posting sets of the query's trigrams and then
+    verified, so results are identical to a linear scan and in the order keys were indexed.
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = list(keys)
+        postings = defaultdict(set)
+        for position, key in enumerate(self.keys):
+            for gram in self._grams(key):
+                postings[gram].add(position)
+        self._postings = dict(postings)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _grams(self, s: str) -> set[str]:
+        size = self.GRAM_SIZE
+        return {s[i : i + size] for i in range(len(s) - size + 1)}
+
+    def search(self, substr: str) -> list[str]:
+        """
+        Get all keys containing substr
+        """
+        if len(substr) < self.GRAM_SIZE:
+            return [key for key in self.keys if substr in key]
+        postings = []
+        for gram in self._grams(substr):
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = candidates & posting
+            if not candidates:
+                return []
+        return [
+            self.keys[position]
+            for position in sorted(candidates)
+            if substr in self.keys[position]
+        ]
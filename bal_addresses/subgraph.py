@@ -0,0 +1,224 @@
+import json
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+import requests
+
+from .addresses import GITHUB_RAW_OUTPUTS
+from .cache import SourceCache, get_json
+from .errors import GraphQLRequestError, NoResultError
+
+
+DEFAULT_TIMEOUT = 10
+# weight of the latest request in the rolling latency and error rate
+DEFAULT_ALPHA = 0.3
+# seconds an endpoint is skipped after a failure, doubled for every further failure in a row
+DEFAULT_COOLDOWN = 30
+MAX_COOLDOWN = 10 * 60
+DEFAULT_RESULT_TTL = 15
+# latency assumed for endpoints that have never been measured
+UNMEASURED_LATENCY_MS = 1000.0
+
+
+def subgraph_urls() -> dict:
+    """
+    {chain: {subgraph type: url or {status code: url}}} as published by gen_subgraph_urls
+    """
+    return (
+        get_json(
+            f"{GITHUB_RAW_OUTPUTS}/subgraph_urls.json", "outputs/subgraph_urls.json"
+        )
+        or {}
+    )
+
+
+def subgraph_latency() -> dict:
+    """
+    {chain: {subgraph type: ms}} measured by gen_subgraph_urls for the urls that answered
+    """
+    return (
+        get_json(
+            f"{GITHUB_RAW_OUTPUTS}/subgraph_latency.json",
+            "outputs/subgraph_latency.json",
+        )
+        or {}
+    )
+
+
+class Endpoint:
+    """
+    Rolling (exponentially weighted) latency and error rate of one subgraph url
+    """
+
+    def __init__(self, url: str, latency_ms: Optional[float] = None):
+        self.url = url
+        self.latency_ms = latency_ms
+        self.error_rate = 0.0
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def healthy(self, now: Optional[float] = None) -> bool:
+        return self.retry_at <= (time.monotonic() if now is None else now)
+
+    @property
+    def score(self) -> float:
+        """
+        Expected cost of a request, lower is better. Errors weigh like a timeout each
+        """
+        latency_ms = (
+            UNMEASURED_LATENCY_MS if self.latency_ms is None else self.latency_ms
+        )
+        return latency_ms + self.error_rate * DEFAULT_TIMEOUT * 1000
+
+    def record_success(self, latency_ms: float, alpha: float = DEFAULT_ALPHA) -> None:
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += alpha * (latency_ms - self.latency_ms)
+        self.error_rate -= alpha * self.error_rate
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def record_failure(
+        self, alpha: float = DEFAULT_ALPHA, cooldown: float = DEFAULT_COOLDOWN
+    ) -> None:
+        self.error_rate += alpha * (1 - self.error_rate)
+        self.failures += 1
+        self.retry_at = time.monotonic() + min(
+            cooldown * 2 ** (self.failures - 1), MAX_COOLDOWN
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Endpoint({self.url!r}, latency_ms={self.latency_ms}, "
+            f"error_rate={self.error_rate:.2f}, failures={self.failures})"
+        )
+
+
+class SubgraphResolver:
+    """
+    Sends GraphQL queries for one chain to the best endpoint of each subgraph type.
+    Candidates are the urls of outputs/subgraph_urls.json (those that failed their last
+    check last) followed by any extra urls given for the type. Endpoints are ranked by
+    rolling latency and error rate. Latencies start out as measured in
+    outputs/subgraph_latency.json. A failing endpoint is skipped for a cooldown and the
+    query moves on to the next one. Results are cached for result_ttl seconds.
+    """
+
+    def __init__(
+        self,
+        chain: str,
+        extra_urls: Optional[dict[str, Iterable[str]]] = None,
+        urls: Optional[dict] = None,
+        latency_ms: Optional[dict[str, float]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        alpha: float = DEFAULT_ALPHA,
+        cooldown: float = DEFAULT_COOLDOWN,
+        result_ttl: float = DEFAULT_RESULT_TTL,
+        session: Optional[requests.Session] = None,
+    ):
+        self.chain = chain
+        self.timeout = timeout
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.session = session or requests.Session()
+        self.results = SourceCache(ttl=result_ttl)
+        self._lock = threading.Lock()
+        if urls is None:
+            urls = subgraph_urls().get(chain, {})
+            if latency_ms is None:
+                latency_ms = subgraph_latency().get(chain, {})
+        self.endpoints = self._endpoints(urls, extra_urls or {}, latency_ms or {})
+
+    @staticmethod
+    def _endpoints(
+        urls: dict, extra_urls: dict, latency_ms: dict
+    ) -> dict[str, list[Endpoint]]:
+        endpoints = {}
+        for subgraph_type, url in urls.items():
+            if isinstance(url, dict):
+                # failed its last check, only tried once everything else failed too
+                endpoint = Endpoint(next(iter(url.values())))
+                endpoint.error_rate = 1.0
+            else:
+                endpoint = Endpoint(url, latency_ms.get(subgraph_type))
+            endpoints[subgraph_type] = [endpoint]
+        for subgraph_type, extra in extra_urls.items():
+            candidates = endpoints.setdefault(subgraph_type, [])
+            known = {endpoint.url for endpoint in candidates}
+            candidates.extend(Endpoint(url) for url in extra if url not in known)
+        return endpoints
+
+    @property
+    def subgraph_types(self) -> list[str]:
+        return list(self.endpoints)
+
+    def ranked(self, subgraph_type: str) -> list[Endpoint]:
+        """
+        Candidates for subgraph_type in the order they are tried: healthy ones by score,
+        then the ones cooling down by when they may be retried
+        """
+        try:
+            candidates = self.endpoints[subgraph_type]
+        except KeyError:
+            raise NoResultError(f"No {subgraph_type} subgraph known for {self.chain}")
+        now = time.monotonic()
+        with self._lock:
+            healthy = sorted(
+                (e for e in candidates if e.healthy(now)), key=lambda e: e.score
+            )
+            cooling = sorted(
+                (e for e in candidates if not e.healthy(now)), key=lambda e: e.retry_at
+            )
+        return healthy + cooling
+
+    def url(self, subgraph_type: str) -> str:
+        """
+        Url the next query for subgraph_type would be sent to
+        """
+        return self.ranked(subgraph_type)[0].url
+
+    def query(
+        self, subgraph_type: str, query: str, variables: Optional[dict] = None
+    ) -> Any:
+        """
+        The data of a GraphQL query, served from the result cache when recent enough.
+        Raises GraphQLRequestError if every endpoint failed
+        """
+        key = (subgraph_type, query, json.dumps(variables, sort_keys=True))
+        return self.results.get(
+            key, lambda: self._query(subgraph_type, query, variables)
+        )
+
+    def _query(self, subgraph_type: str, query: str, variables: Optional[dict]) -> Any:
+        errors = []
+        for endpoint in self.ranked(subgraph_type):
+            start = time.perf_counter()
+            try:
+                data = self._post(endpoint.url, query, variables)
+            except (requests.RequestException, ValueError, GraphQLRequestError) as e:
+                with self._lock:
+                    endpoint.record_failure(self.alpha, self.cooldown)
+                errors.append(f"{endpoint.url}: {e}")
+                continue
+            with self._lock:
+                endpoint.record_success(
+                    (time.perf_counter() - start) * 1000, self.alpha
+                )
+            return data
+        raise GraphQLRequestError(
+            f"All {subgraph_type} subgraphs of {self.chain} failed: "
+            + "; ".join(errors)
+        )
+
+    def _post(self, url: str, query: str, variables: Optional[dict]) -> Any:
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+        response = self.session.post(url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        body = response.json()
+        if body.get("errors") or body.get("data") is None:
+            raise GraphQLRequestError(body.get("errors"))
+        return body["data"]
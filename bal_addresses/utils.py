@@ -1,16 +1,97 @@
+from functools import lru_cache
+from typing import Iterable, Optional
+
 from web3 import Web3
 
 
+CHECKSUM_CACHE_SIZE = 2**16
+
+
 ### These functions are to deal with differing web3 versions and the need to use 5.x for legacy brownie code
+# The web3 flavour is resolved once at import
+_web3_to_checksum_address = (
+    Web3.toChecksumAddress
+    if hasattr(Web3, "toChecksumAddress")
+    else Web3.to_checksum_address
+)
+_web3_is_address = Web3.isAddress if hasattr(Web3, "isAddress") else Web3.is_address
+
+
+@lru_cache(maxsize=CHECKSUM_CACHE_SIZE)
+def _checksum(address) -> Optional[str]:
+    """
+    Memoized checksum, None if address can not be checksummed
+    """
+    try:
+        return _web3_to_checksum_address(address)
+    except Exception:
+        return None
+
+
+def _cache_key(address):
+    # the checksum does not depend on the input casing
+    return address.lower() if isinstance(address, str) else address
+
+
 def to_checksum_address(address: str):
-    if hasattr(Web3, "toChecksumAddress"):
-        return Web3.toChecksumAddress(address)
-    if hasattr(Web3, "to_checksum_address"):
-        return Web3.to_checksum_address(address)
+    checksummed = _checksum(_cache_key(address))
+    if checksummed is None:
+        # let web3 raise its own error
+        return _web3_to_checksum_address(address)
+    return checksummed
+
+
+def to_checksum_addresses(addresses: Iterable[str]) -> list[str]:
+    """
+    Checksum a batch of addresses, every unique address is only hashed once
+    """
+    addresses = list(addresses)
+    checksummed = {
+        address: to_checksum_address(address) for address in dict.fromkeys(addresses)
+    }
+    return [checksummed[address] for address in addresses]
+
+
+def checksum_if_address(value: str) -> str:
+    """
+    Checksum value if it is an address, otherwise return it unchanged
+    """
+    checksummed = _checksum(_cache_key(value))
+    return value if checksummed is None else checksummed
 
 
 def is_address(address: str):
-    if hasattr(Web3, "isAddress"):
-        return Web3.isAddress(address)
-    if hasattr(Web3, "is_address"):
-        return Web3.is_address(address)
+    return _web3_is_address(address)
+
+
+class lazy_class_attribute:
+    """
+    Class attribute computed by `loader(cls)` on first access, then stored on the class.
+    Used to keep network and disk access out of import time.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.__doc__ = loader.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner):
+        value = self.loader(owner)
+        setattr(owner, self.name, value)
+        return value
+
+
+class class_property:
+    """
+    Class attribute computed by `loader(cls)` on every access, for values read through
+    the shared source cache that must not outlive its ttl
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.__doc__ = loader.__doc__
+
+    def __get__(self, obj, owner):
+        return self.loader(owner)
@@ -1,6 +1,18 @@
+import argparse
 import json
+from pathlib import Path
 
-from bal_addresses import AddrBook
+import bal_addresses
+from bal_addresses import AddrBook, source_cache
+from bal_addresses.addresses import (
+    build_flatbooks,
+    build_global_reverse_index,
+    prefetch_sources,
+)
+from bal_addresses.binary import BINARY_SUFFIX, pack_addrbook
+from bal_addresses.cache import get_json
+from bal_addresses.executor import report_failures
+from bal_addresses.manifest import Manifest, hash_file, hash_files, hash_json
 
 
 def reverse_dict(d):
@@ -9,22 +21,126 @@ def reverse_dict(d):
     return inv_map
 
 
-def write_addressbooks(chainlist=AddrBook.chain_ids_by_name.keys()):
-    for chain in chainlist:
+def code_hash():
+    """
+    Hash of what shapes the books besides their sources: the library, this script
+    and the chain list
+    """
+    package = Path(bal_addresses.__file__).parent
+    files = [str(path) for path in package.glob("*.py")] + [__file__]
+    return hash_json({"files": hash_files(files), "chains": AddrBook.chains})
+
+
+def source_inputs(chain, hashes):
+    """
+    {url: content hash} of the sources of chain, hashes memoizes them across chains
+    """
+    inputs = {}
+    for url, local_path in AddrBook.sources(chain):
+        if url not in hashes:
+            try:
+                hashes[url] = hash_json(get_json(url, local_path))
+            except Exception:
+                hashes[url] = "unavailable"
+        inputs[url] = hashes[url]
+    return inputs
+
+
+def addressbook_paths(chain):
+    return [
+        f"outputs/{chain}.json",
+        f"outputs/{chain}_reverse.json",
+        f"outputs/{chain}{BINARY_SUFFIX}",
+    ]
+
+
+def write_addressbook(chain, flatbook, manifest, inputs=None):
+    reversebook = reverse_dict(flatbook)
+    manifest.write_json(f"outputs/{chain}.json", dict(sorted(flatbook.items())), inputs)
+    manifest.write_json(f"outputs/{chain}_reverse.json", reversebook, inputs)
+    manifest.write_bytes(
+        f"outputs/{chain}{BINARY_SUFFIX}", pack_addrbook(flatbook, reversebook), inputs
+    )
+
+
+def write_addressbooks(
+    chainlist=AddrBook.chain_ids_by_name.keys(), manifest=None, force=False
+):
+    """
+    Build the books of all chains in one batch and write them, returns {chain: flatbook}.
+    Chains whose sources did not change since the manifest recorded them are skipped
+    unless force is set. Skipped and failed chains keep their previous outputs, their
+    books are then read from those
+    """
+    chainlist = list(chainlist)
+    if manifest is None:
+        manifest = Manifest()
+    code = code_hash()
+    with source_cache.hold():
+        prefetch_sources(chainlist)
+        hashes = {}
+        inputs = {
+            chain: {"code": code, **source_inputs(chain, hashes)} for chain in chainlist
+        }
+        stale = [
+            chain
+            for chain in chainlist
+            if force
+            or not all(
+                manifest.is_current(path, inputs[chain])
+                for path in addressbook_paths(chain)
+            )
+        ]
+        print(
+            f"Building addressbooks for {stale}, "
+            f"{len(chainlist) - len(stale)} chain(s) unchanged"
+        )
+        flatbooks, failures = build_flatbooks(stale)
+    for chain, flatbook in flatbooks.items():
         print(f"Writing addressbooks for {chain}")
-        flatbook = AddrBook(chain).generate_flatbook()
-        with open(f"outputs/{chain}.json", "w") as f:
-            json.dump(dict(sorted(flatbook.items())), f, indent=2)
-            f.write("\n")
-        with open(f"outputs/{chain}_reverse.json", "w") as f:
-            json.dump(reverse_dict(flatbook), f, indent=2)
-            f.write("\n")
+        write_addressbook(chain, flatbook, manifest, inputs[chain])
+    report_failures(failures)
+    for chain in chainlist:
+        if chain in flatbooks:
+            continue
+        try:
+            with open(f"outputs/{chain}.json") as f:
+                flatbooks[chain] = json.load(f)
+        except FileNotFoundError:
+            continue
+    return {chain: flatbooks[chain] for chain in chainlist if chain in flatbooks}
+
+
+def write_reverse_index(flatbooks, manifest=None):
+    """
+    Write the cross chain {address: [[chain, path], ...]} index of all flatbooks
+    """
+    if manifest is None:
+        manifest = Manifest()
+    inputs = {
+        f"{chain}.json": hash_file(f"outputs/{chain}.json") for chain in flatbooks
+    }
+    if manifest.is_current("outputs/reverse_index.json", inputs):
+        return
+    manifest.write_json(
+        "outputs/reverse_index.json", build_global_reverse_index(flatbooks), inputs
+    )
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild chains whose sources did not change",
+    )
+    args = parser.parse_args()
     chains = AddrBook.chain_ids_by_name.keys()
     print(f"Generating new addressbook jsons for {chains}")
-    write_addressbooks(chains)
+    manifest = Manifest()
+    flatbooks = write_addressbooks(chains, manifest, args.force)
+    write_reverse_index(flatbooks, manifest)
+    manifest.save()
 
 
 if __name__ == "__main__":
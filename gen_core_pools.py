@@ -1,53 +1,78 @@
 import json
+from bal_addresses.executor import map_chains_isolated
+from bal_addresses.manifest import Manifest
 from bal_tools import BalPoolsGauges
 
 
-def remove_orphaned_whitelist_entries():
+def voting_pool_ids_by_chain(vebal_voting_list) -> dict:
+    """
+    {chain: {lower case pool id}} of a vebal voting list, entries without a chain are skipped
+    """
+    pool_ids = {}
+    for pool in vebal_voting_list or []:
+        if pool.get("chain"):
+            pool_ids.setdefault(pool["chain"].lower(), set()).add(pool["id"].lower())
+    return pool_ids
+
+
+def remove_orphaned_whitelist_entries(vebal_voting_list=None):
     """
     Remove whitelist entries that are no longer on the vebal voting list.
+    Chains covered by vebal_voting_list (as already fetched by build_core_pools) are checked
+    against it, the voting list of any other chain is queried.
     Updates the whitelist file in place.
     """
     # Load whitelist
     with open("config/core_pools_whitelist.json", "r") as f:
         whitelist = json.load(f)
+    shared_pool_ids = voting_pool_ids_by_chain(vebal_voting_list)
+
+    def voting_pool_ids(chain):
+        if chain in shared_pool_ids:
+            return shared_pool_ids[chain]
+        pool_gauge = BalPoolsGauges(chain=chain, use_cached_core_pools=False)
+        return {pool["id"].lower() for pool in pool_gauge.vebal_voting_list}
+
+    def check_chain(chain):
+        """
+        Split the whitelisted pools of chain into (kept, orphaned)
+        """
+        whitelisted_pools = whitelist[chain]
+        vebal_pool_ids = voting_pool_ids(chain)
+
+        # Separate orphaned entries from valid ones
+        kept, chain_orphans = {}, {}
+        for pool_id, symbol in whitelisted_pools.items():
+            if pool_id.lower() not in vebal_pool_ids:
+                chain_orphans[pool_id] = symbol
+            else:
+                kept[pool_id] = symbol
+        return kept, chain_orphans
+
+    # Check each chain with whitelisted pools
+    results, failures = map_chains_isolated(
+        check_chain, [chain for chain, pools in whitelist.items() if pools]
+    )
 
     orphaned_entries = {}
     updated_whitelist = {}
-
-    # Check each chain
     for chain, whitelisted_pools in whitelist.items():
         updated_whitelist[chain] = {}
-
         if not whitelisted_pools:
             continue
-
-        # Get vebal voting list for this chain
-        try:
-            pool_gauge = BalPoolsGauges(chain=chain, use_cached_core_pools=False)
-            vebal_pool_ids = {
-                pool["id"].lower() for pool in pool_gauge.vebal_voting_list
-            }
-
-            # Separate orphaned entries from valid ones
-            chain_orphans = {}
-            for pool_id, symbol in whitelisted_pools.items():
-                if pool_id.lower() not in vebal_pool_ids:
-                    chain_orphans[pool_id] = symbol
-                else:
-                    updated_whitelist[chain][pool_id] = symbol
-
-            if chain_orphans:
-                orphaned_entries[chain] = chain_orphans
-                print(
-                    f"Removing {len(chain_orphans)} orphaned whitelist entries on {chain}"
-                )
-                for pool_id, symbol in chain_orphans.items():
-                    print(f"  - {symbol}: {pool_id}")
-        except Exception as e:
-            print(f"Error checking {chain}: {e}")
+        if chain in failures:
+            print(f"Error checking {chain}: {failures[chain]}")
             # Keep original entries if there's an error
             updated_whitelist[chain] = whitelisted_pools
             continue
+        updated_whitelist[chain], chain_orphans = results[chain]
+        if chain_orphans:
+            orphaned_entries[chain] = chain_orphans
+            print(
+                f"Removing {len(chain_orphans)} orphaned whitelist entries on {chain}"
+            )
+            for pool_id, symbol in chain_orphans.items():
+                print(f"  - {symbol}: {pool_id}")
 
     # Write updated whitelist back to file
     with open("config/core_pools_whitelist.json", "w") as f:
@@ -58,7 +83,15 @@ def remove_orphaned_whitelist_entries():
 
 
 def main():
-    core_pools_all_chains = BalPoolsGauges().build_core_pools(return_all_chains=True)
+    manifest = Manifest()
+    pool_gauge = BalPoolsGauges()
+    core_pools_all_chains = pool_gauge.build_core_pools(return_all_chains=True)
+    # reused by the orphan check instead of querying it again for every chain
+    try:
+        vebal_voting_list = pool_gauge.vebal_voting_list
+    except Exception as e:
+        print(f"WARNING: Could not reuse the vebal voting list: {e!r}")
+        vebal_voting_list = None
 
     with open("extras/chains.json", "r") as f:
         chains = json.load(f)
@@ -66,12 +99,13 @@ def main():
         assert chain in core_pools_all_chains, f"Missing core pools entry for {chain}"
 
     # dump the collected dict to json file
-    with open("outputs/core_pools.json", "w") as f:
-        json.dump(core_pools_all_chains, f, indent=2, sort_keys=True)
-        f.write("\n")
+    manifest.write_json(
+        "outputs/core_pools.json", core_pools_all_chains, sort_keys=True
+    )
+    manifest.save()
 
     # remove orphaned whitelist entries
-    orphaned_entries = remove_orphaned_whitelist_entries()
+    orphaned_entries = remove_orphaned_whitelist_entries(vebal_voting_list)
 
     if orphaned_entries:
         print("\n=== Removed Orphaned Whitelist Entries ===")
@@ -1,66 +1,298 @@
+import argparse
 import requests
 import json
 import os
 from bal_addresses import AddrBook, GITHUB_DEPLOYMENTS_RAW, NoResultError
+from bal_addresses.executor import map_chains_isolated, report_failures
+from bal_addresses.manifest import Manifest, hash_json
+from bal_addresses.multicall import DEFAULT_CHUNK_SIZE, Multicall
 from web3 import Web3
 from bal_tools import Web3Rpc
 
 
 DRPC_KEY = os.getenv("DRPC_KEY")
+MULTICALL_CHUNK_SIZE = int(os.getenv("MULTICALL_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+LOG_BLOCK_RANGE = int(os.getenv("LOG_BLOCK_RANGE", 1_000_000))
+# blocks below the head that are read on chains without a finalized block tag
+CONFIRMATIONS = int(os.getenv("CONFIRMATIONS", 64))
+CHECKPOINTS_FILE = "outputs/permissions/checkpoints.json"
 
 
-def build_chain_permissions_list(chain_name):
-    a = AddrBook(chain_name)
-    results = {}
-    action_ids_list = (
-        f"{GITHUB_DEPLOYMENTS_RAW}/action-ids/{chain_name}/action-ids.json"
+def read_role_members(authorizer, action_ids, multicall, block="latest"):
+    """
+    {action_id: [members]} of every action id with at least one member, in action_ids order.
+    All counts are read in one batch, then all members in a second one.
+    """
+    counts = multicall.call(
+        (
+            authorizer.functions.getRoleMemberCount(action_id)
+            for action_id in action_ids
+        ),
+        block,
+    )
+    member_calls = [
+        (action_id, i)
+        for action_id, count in zip(action_ids, counts)
+        for i in range(count)
+    ]
+    members = multicall.call(
+        (
+            authorizer.functions.getRoleMember(action_id, i)
+            for action_id, i in member_calls
+        ),
+        block,
     )
-    w3 = Web3Rpc(chain_name, DRPC_KEY)
+    results = {}
+    for (action_id, _), member in zip(member_calls, members):
+        results.setdefault(action_id, []).append(str(member))
+    return results
+
+
+def fetch_role_events(authorizer, from_block, to_block, block_range=LOG_BLOCK_RANGE):
+    """
+    RoleGranted and RoleRevoked events of authorizer from from_block to to_block (inclusive)
+    in chain order. Logs are requested in pages of up to block_range blocks, a page the
+    node rejects (too wide or too many logs) is halved until it goes through.
+    """
+    w3 = authorizer.w3
+    events_by_topic = {
+        w3.keccak(text="RoleGranted(bytes32,address,address)"): (
+            authorizer.events.RoleGranted()
+        ),
+        w3.keccak(text="RoleRevoked(bytes32,address,address)"): (
+            authorizer.events.RoleRevoked()
+        ),
+    }
+    events = []
+    start = from_block
+    while start <= to_block:
+        end = min(start + block_range - 1, to_block)
+        try:
+            logs = w3.eth.get_logs(
+                {
+                    "address": authorizer.address,
+                    "fromBlock": start,
+                    "toBlock": end,
+                    "topics": [[Web3.to_hex(topic) for topic in events_by_topic]],
+                }
+            )
+        except Exception as e:
+            if end == start:
+                raise
+            block_range = (end - start + 1) // 2
+            print(
+                f"WARNING: get_logs of {start}-{end} failed, trying {block_range}: {e}"
+            )
+            continue
+        start = end + 1
+        for log in logs:
+            event = events_by_topic[log["topics"][0]]
+            events.append(event.process_log(log))
+    return sorted(events, key=lambda e: (e.blockNumber, e.logIndex))
+
+
+def apply_role_events(permissions, events):
+    """
+    Replay events on {action_id: [members]} in place. Member order follows the Authorizer's
+    EnumerableSet: grants are appended, a revoke moves the last member into the gap.
+    """
+    for event in events:
+        action_id = Web3.to_hex(event.args.role)
+        account = str(event.args.account)
+        members = permissions.setdefault(action_id, [])
+        if event.event == "RoleGranted":
+            if account not in members:
+                members.append(account)
+        elif account in members:
+            members[members.index(account)] = members[-1]
+            members.pop()
+        if not members:
+            del permissions[action_id]
+    return permissions
+
+
+def sync_role_members(
+    authorizer,
+    action_ids,
+    permissions,
+    from_block,
+    to_block,
+    block_range=LOG_BLOCK_RANGE,
+):
+    """
+    Bring permissions, as read by read_role_members for the same action_ids at
+    from_block - 1, up to to_block by replaying the role events in between. Nothing is
+    read from the Authorizer, action ids without members start out empty.
+    Returns the same as read_role_members(authorizer, action_ids, multicall, to_block).
+    """
+    known = set(action_ids)
+    synced = {
+        action_id: list(members)
+        for action_id, members in permissions.items()
+        if action_id in known
+    }
+    events = fetch_role_events(authorizer, from_block, to_block, block_range)
+    apply_role_events(synced, [e for e in events if Web3.to_hex(e.args.role) in known])
+    print(f"Replayed {len(events)} role events")
+    return {
+        action_id: synced[action_id] for action_id in action_ids if action_id in synced
+    }
+
+
+def hash_action_ids(action_ids):
+    return hash_json(sorted(action_ids))
+
+
+def finalized_block(w3, confirmations=CONFIRMATIONS):
+    """
+    Latest block that should not be reorged: the finalized one, or confirmations blocks
+    below the head where the node does not know the finalized tag
+    """
+    try:
+        return w3.eth.get_block("finalized")["number"]
+    except Exception as e:
+        print(f"WARNING: No finalized block, using head - {confirmations}: {e}")
+        return max(w3.eth.block_number - confirmations, 0)
+
 
+def get_authorizer(chain_name, w3):
+    a = AddrBook(chain_name)
     try:
         authorizer_address = a.search_unique("20210418-authorizer/Authorizer").address
     except NoResultError as e:
         print(f"WARNING: Authorizer not found: {e}")
-        return results
-    authorizer = w3.eth.contract(
+        return None
+    return w3.eth.contract(
         address=authorizer_address,
         abi=json.load(open("bal_addresses/abis/Authorizer.json")),
     )
+
+
+def get_action_ids(chain_name):
+    """
+    Unique action ids of chain in order of first appearance in action-ids.json
+    """
+    action_ids_list = (
+        f"{GITHUB_DEPLOYMENTS_RAW}/action-ids/{chain_name}/action-ids.json"
+    )
     try:
         result = requests.get(action_ids_list)
     except requests.exceptions.HTTPError as err:
         print(f"URL: {requests.request.url} returned error {err}")
     input = result.json()
+    action_ids = {}
     for deployment, contracts in input.items():
-        print(f"Processing {deployment}")
         for data in contracts.values():
             for action_id in data["actionIds"].values():
-                if action_id in results:
-                    continue  # already have data
-                numMembers = authorizer.functions.getRoleMemberCount(action_id).call()
-                if numMembers > 0:
-                    memberAddressList = []
-                    for i in range(0, numMembers, 1):
-                        caller = str(
-                            authorizer.functions.getRoleMember(action_id, i).call()
-                        )
-                        memberAddressList.append(caller)
-
-                    results[action_id] = memberAddressList
-    return results
+                action_ids[action_id] = None
+    return list(action_ids)
+
+
+def build_chain_permissions_list(
+    chain_name,
+    w3=None,
+    chunk_size=MULTICALL_CHUNK_SIZE,
+    block="latest",
+    permissions=None,
+    checkpoint=None,
+    action_ids=None,
+):
+    """
+    Active permissions of chain at block. Given the permissions written at block checkpoint
+    for the same action ids only the role events since are replayed, otherwise every
+    action id is read.
+    """
+    if w3 is None:
+        w3 = Web3Rpc(chain_name, DRPC_KEY)
+    authorizer = get_authorizer(chain_name, w3)
+    if authorizer is None:
+        return {}
+    if action_ids is None:
+        action_ids = get_action_ids(chain_name)
+    if permissions is not None and checkpoint is not None:
+        try:
+            return sync_role_members(
+                authorizer, action_ids, permissions, checkpoint + 1, block
+            )
+        except Exception as e:
+            print(f"WARNING: Incremental sync failed, rescanning: {e}")
+    print(f"Reading members of {len(action_ids)} action ids")
+    return read_role_members(authorizer, action_ids, Multicall(w3, chunk_size), block)
+
 
+def load_checkpoints():
+    if not os.path.exists(CHECKPOINTS_FILE):
+        return {}
+    with open(CHECKPOINTS_FILE) as f:
+        return json.load(f)
 
-def generate_chain_files(chain):
-    permissions = build_chain_permissions_list(chain)
-    with open(f"outputs/permissions/active/{chain}.json", "w") as f:
-        json.dump(permissions, f, indent=2)
-        f.write("\n")
+
+def save_checkpoints(checkpoints, manifest):
+    manifest.write_json(CHECKPOINTS_FILE, dict(sorted(checkpoints.items())))
+
+
+def generate_chain_files(chain, manifest, full=False, checkpoint=None):
+    """
+    Write the active permissions of chain as of its finalized block, syncing from
+    checkpoint unless full is set or action-ids.json changed since.
+    Returns the new checkpoint, {"block": read at, "action_ids": hash of the action ids}
+    """
+    path = f"outputs/permissions/active/{chain}.json"
+    w3 = Web3Rpc(chain, DRPC_KEY)
+    block = finalized_block(w3)
+    action_ids = get_action_ids(chain)
+    action_ids_hash = hash_action_ids(action_ids)
+    permissions = None
+    checkpoint_block = None
+    # an older checkpoint, or one taken for other action ids, means a full read
+    if (
+        not full
+        and isinstance(checkpoint, dict)
+        and checkpoint.get("action_ids") == action_ids_hash
+        and os.path.exists(path)
+    ):
+        if block <= checkpoint["block"]:
+            print(f"{chain} permissions are current as of block {checkpoint['block']}")
+            return checkpoint
+        with open(path) as f:
+            permissions = json.load(f)
+        checkpoint_block = checkpoint["block"]
+    permissions = build_chain_permissions_list(
+        chain,
+        w3,
+        block=block,
+        permissions=permissions,
+        checkpoint=checkpoint_block,
+        action_ids=action_ids,
+    )
+    manifest.write_json(
+        path, permissions, {"action-ids.json": action_ids_hash, "block": str(block)}
+    )
+    return {"block": block, "action_ids": action_ids_hash}
 
 
 def main():
-    for chain in AddrBook.chains.BALANCER_PRODUCTION_CHAINS:
-        print(f"\n\n\nGenerating Permissions Data for {chain.capitalize()}\n\n\n")
-        generate_chain_files(chain)
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Read every action id again instead of syncing from the last checkpoint",
+    )
+    args = parser.parse_args()
+    checkpoints = load_checkpoints()
+    manifest = Manifest()
+
+    def generate(chain):
+        print(f"Generating Permissions Data for {chain.capitalize()}")
+        return generate_chain_files(chain, manifest, args.full, checkpoints.get(chain))
+
+    synced, failures = map_chains_isolated(
+        generate, AddrBook.chains.BALANCER_PRODUCTION_CHAINS
+    )
+    # failed chains keep both their previous output and checkpoint
+    save_checkpoints({**checkpoints, **synced}, manifest)
+    manifest.save()
+    report_failures(failures)
 
 
 if __name__ == "__main__":
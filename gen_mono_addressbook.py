@@ -6,16 +6,27 @@
 import os
 import re
 import json
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from bal_addresses import AddrBook
+from bal_addresses.executor import DEFAULT_MAX_WORKERS
+from bal_addresses.manifest import Manifest, hash_file
 
 
 deployments = os.environ["DEPLOYMENTS_REPO_ROOT_URL"]
 basepath = deployments
 
 
+def load_json(path, default=None):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
 def main():
+    manifest = Manifest()
     # Get deployments
     active_deployments = []
     old_deployments = []
@@ -36,73 +47,82 @@ def main():
     old = process_deployments(old_deployments, True)
 
     results = {"active": active, "old": old}
-    with open("outputs/deployments.json", "w") as f:
-        json.dump(results, f, indent=2)
-        f.write("\n")
-    ### Add extras
+    manifest.write_json("outputs/deployments.json", results)
+    ### Add extras, every shared file is read (and checksummed) once
+    multisigs = load_json("extras/multisigs.json")
+    signers = AddrBook.checksum_address_dict(load_json("extras/signers.json"))
+    pools = load_json("outputs/pools.json")
+    gauges = load_json("outputs/gauges.json")
     for chain in active.keys():
-        with open("extras/multisigs.json", "r") as f:
-            data = json.load(f)
-            data = data.get(chain, {})
-            data = AddrBook.checksum_address_dict(data)
+        data = AddrBook.checksum_address_dict(multisigs.get(chain, {}))
         if "multisigs" not in active[chain].keys():
             active[chain]["multisigs"] = {}
         for multisig, address in data.items():
             active[chain]["multisigs"][multisig] = address
         ### add signers
-        if "EOA" not in active[chain].keys():
-            active[chain]["EOA"] = {}
-        with open("extras/signers.json", "r") as f:
-            data = json.load(f)
-            data = AddrBook.checksum_address_dict(data)
-            active[chain]["EOA"] = data
+        active[chain]["EOA"] = signers
         ### add pools
-        if "pools" not in active[chain]:
-            active[chain]["pools"] = {}
-        with open("outputs/pools.json", "r") as f:
-            data = json.load(f)
-            data = data.get(chain, {})
-            data = AddrBook.checksum_address_dict(data)
-            active[chain]["pools"] = data
+        active[chain]["pools"] = AddrBook.checksum_address_dict(pools.get(chain, {}))
         ### add gauges
-        if "gauges" not in active[chain]:
-            active[chain]["gauges"] = {}
-        with open("outputs/gauges.json", "r") as f:
-            data = json.load(f)
-            data = data.get(chain, {})
-            data = AddrBook.checksum_address_dict(data)
-            active[chain]["gauges"] = data
+        active[chain]["gauges"] = AddrBook.checksum_address_dict(gauges.get(chain, {}))
         ### add extras
         try:
-            with open(f"extras/{chain}.json") as f:
-                data = json.load(f)
-                data = AddrBook.checksum_address_dict(data)
+            data = AddrBook.checksum_address_dict(load_json(f"extras/{chain}.json", {}))
         except:
             data = {}
 
         active[chain] = data | active[chain]
     results = {"active": active, "old": old}
-    with open("outputs/addressbook.json", "w") as f:
-        json.dump(results, f, indent=2)
-        f.write("\n")
-
-
-def process_deployments(deployments, old=False):
-    result = {}
-    for version in ["v2", "v3"]:
-        for task in deployments:
-            if old:
-                path = Path(f"{basepath}/{version}/deprecated/{task}/output")
-            else:
-                path = Path(f"{basepath}/{version}/tasks/{task}/output")
-            for file in list(sorted(path.glob("*.json"))):
-                chain = file.stem
+    sources = [
+        "outputs/deployments.json",
+        "outputs/pools.json",
+        "outputs/gauges.json",
+        "extras/multisigs.json",
+        "extras/signers.json",
+        *(f"extras/{chain}.json" for chain in active),
+    ]
+    manifest.write_json(
+        "outputs/addressbook.json",
+        results,
+        {path: hash_file(path) for path in sources},
+    )
+    manifest.save()
+
+
+def read_task_outputs(path):
+    """
+    [(chain, {contract: address})] of the output files of a task, ordered by file name
+    """
+    try:
+        with os.scandir(path) as it:
+            names = sorted(entry.name for entry in it if entry.name.endswith(".json"))
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    outputs = []
+    for name in names:
+        with open(os.path.join(path, name), "r") as f:
+            outputs.append((name[: -len(".json")], json.load(f)))
+    return outputs
+
+
+def process_deployments(deployments, old=False, max_workers=DEFAULT_MAX_WORKERS):
+    folder = "deprecated" if old else "tasks"
+    paths = [
+        f"{basepath}/{version}/{folder}/{task}/output"
+        for version in ["v2", "v3"]
+        for task in deployments
+    ]
+    # read the task directories in parallel, merge in the order they are listed
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outputs = executor.map(read_task_outputs, paths)
+        tasks = [task for _ in ["v2", "v3"] for task in deployments]
+        result = {}
+        for task, task_outputs in zip(tasks, outputs):
+            for chain, data in task_outputs:
                 if chain not in result.keys():
                     result[chain] = {}
                 if task not in result[chain].keys():
                     result[chain][task] = {}
-                with open(str(file), "r") as f:
-                    data = json.load(f)
                 for contract, address in data.items():
                     result[chain][task][contract] = address
     return result
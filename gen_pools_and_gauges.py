@@ -1,10 +1,30 @@
 import json
+from collections import Counter
 
-import pandas as pd
-
+from bal_addresses.executor import map_chains_isolated, report_failures
+from bal_addresses.labels import unique_labels
+from bal_addresses.manifest import Manifest
 from bal_tools import BalPoolsGauges
 
 
+def label_by_address(rows, labels) -> dict:
+    """
+    {label: address} ordered by address, raises if a label is used twice
+    """
+    counts = Counter(labels)
+    duplicates = [(label, row) for label, row in zip(labels, rows) if counts[label] > 1]
+    # confirm no duplicate symbols exist, raise if so
+    if duplicates:
+        print("Found duplicate symbols!")
+        for label, row in sorted(duplicates, key=lambda d: d[0]):
+            print(f"{label}: {row['address']}")
+        raise
+    return {
+        label: row["address"]
+        for label, row in sorted(zip(labels, rows), key=lambda d: d[1]["address"])
+    }
+
+
 def process_query_pools(result) -> dict:
     flattened_result = []
     for pool_data in result:
@@ -15,133 +35,174 @@ def process_query_pools(result) -> dict:
         flattened_result.append(
             {"address": pool_data.address, "symbol": pool_data.symbol}
         )
-    df = pd.DataFrame(flattened_result)
-    if len(df) == 0:
+    if len(flattened_result) == 0:
         return
     # assert no duplicate addresses exist
-    assert len(df["address"].unique()) == len(df)
-
-    # solve issue of duplicate pool symbols by appending address prefix
-    df["original_symbol"] = df["symbol"]
-    df["symbol"] = df["symbol"] + "-" + df["address"].str[2:6]
-
-    # only extend address suffix for symbols that still have collisions
-    colliding_symbols = df[df["symbol"].duplicated(keep=False)][
-        "original_symbol"
-    ].unique()
-    for original_symbol_with_collision in colliding_symbols:
-        collision_group_mask = df["original_symbol"] == original_symbol_with_collision
-        collision_group = df[collision_group_mask]
-
-        for address_suffix_length in range(4, 43):  # max 40 hex chars in address
-            symbols_with_longer_suffix = (
-                collision_group["original_symbol"]
-                + "-"
-                + collision_group["address"].str[2 : 2 + address_suffix_length]
-            )
-            if symbols_with_longer_suffix.nunique() == len(symbols_with_longer_suffix):
-                df.loc[collision_group_mask, "symbol"] = symbols_with_longer_suffix
-                break
-
-    df = df.drop(columns=["original_symbol"])
+    addresses = [pool["address"] for pool in flattened_result]
+    assert len(set(addresses)) == len(addresses)
 
-    # confirm no duplicate symbols exist, raise if so
-    if len(df["symbol"].unique()) != len(df):
-        print("Found duplicate symbols!")
-        print(df[df["symbol"].duplicated(keep=False)].sort_values("symbol"))
-        raise
-    return df.sort_values("address").set_index("symbol")["address"].to_dict()
+    # solve issue of duplicate pool symbols by appending the shortest unique address prefix
+    labels = unique_labels([pool["symbol"] for pool in flattened_result], addresses)
+    return label_by_address(flattened_result, labels)
 
 
 def process_query_gauges(result) -> dict:
-    df = pd.DataFrame(result)
-    if len(df) == 0:
+    if len(result) == 0:
         return
     # assert no duplicate addresses exist
-    assert len(df["address"].unique()) == len(df)
+    addresses = [gauge["address"] for gauge in result]
+    assert len(set(addresses)) == len(addresses)
 
     # solve issue of duplicate gauge symbols
-    df["symbol"] = df["symbol"] + "-" + df["address"].str[2:6]
-
-    # confirm no duplicate symbols exist, raise if so
-    if len(df["symbol"].unique()) != len(df):
-        print("Found duplicate symbols!")
-        print(df[df["symbol"].duplicated(keep=False)].sort_values("symbol"))
-        raise
-    return df.sort_values("address").set_index("symbol")["address"].to_dict()
+    labels = unique_labels(
+        [gauge["symbol"] for gauge in result], addresses, extend=False
+    )
+    return label_by_address(result, labels)
+
+
+def index_gauges_by_address(gauges) -> dict:
+    """
+    {gauge address: (chain, symbol)} over the gauges of all chains.
+    If an address shows up more than once the last one wins.
+    """
+    index = {}
+    for chain, chain_gauges in gauges.items():
+        for symbol, gauge in chain_gauges.items():
+            index[gauge] = (chain, symbol)
+    return index
+
+
+def join_root_gauges(result, gauges) -> list:
+    """
+    [(root_gauge, chain, child symbol)] of every root gauge whose recipient is a known
+    child gauge, in the order of result
+    """
+    index = index_gauges_by_address(gauges)
+    joined = []
+    for root_gauge in result:
+        if "chain" not in root_gauge:
+            # mainnet root gauge == child gauge
+            continue
+        child = index.get(root_gauge["recipient"])
+        if child:
+            joined.append((root_gauge, *child))
+    return joined
+
+
+def root_gauge_children(result, gauges) -> dict:
+    """
+    {root gauge: {"chain", "child_gauge", "child_symbol"}} ordered by root gauge
+    """
+    children = {
+        root_gauge["id"]: {
+            "chain": chain,
+            "child_gauge": root_gauge["recipient"],
+            "child_symbol": symbol,
+        }
+        for root_gauge, chain, symbol in join_root_gauges(result, gauges)
+    }
+    return dict(sorted(children.items()))
 
 
 def process_query_root_gauges(result, gauges) -> dict:
     # map to child gauges
-    df = []
-    for root_gauge in result:
-        for chain in gauges:
-            for symbol, gauge in gauges[chain].items():
-                if "chain" not in root_gauge:
-                    # mainnet root gauge == child gauge
-                    continue
-                if root_gauge["recipient"] == gauge:
-                    root_gauge["symbol"] = symbol[:-4].replace(
-                        "-gauge-", f"-{root_gauge['chain'].lower()}-root-"
-                    )
-                    root_gauge["symbol"] += f"{root_gauge['id'][2:6]}"
-                    df.append(root_gauge)
-
-    if len(df) == 0:
-        return
-    df = pd.DataFrame(df)
-
+    joined = join_root_gauges(result, gauges)
+    labels = unique_labels(
+        [
+            symbol[:-4].replace("-gauge-", f"-{root_gauge['chain'].lower()}-root-")
+            for root_gauge, _, symbol in joined
+        ],
+        [root_gauge["id"] for root_gauge, _, _ in joined],
+        separator="",
+        extend=False,
+    )
     # drop duplicates
-    df = df[~df.duplicated()]
+    rows = {}
+    for (root_gauge, _, _), label in zip(joined, labels):
+        row = {**root_gauge, "symbol": label}
+        rows.setdefault(json.dumps(row, sort_keys=True, default=str), row)
+    rows = list(rows.values())
+
+    if len(rows) == 0:
+        return
 
     # assert no duplicate addresses exist
-    assert len(df["id"].unique()) == len(df)
+    assert len({row["id"] for row in rows}) == len(rows)
 
     # confirm no duplicate symbols exist, raise if so
-    if len(df["symbol"].unique()) != len(df):
+    counts = Counter(row["symbol"] for row in rows)
+    if len(counts) != len(rows):
         print("Found duplicate symbols!")
-        print(df[df["symbol"].duplicated(keep=False)].sort_values("symbol"))
+        for row in sorted(rows, key=lambda r: r["symbol"]):
+            if counts[row["symbol"]] > 1:
+                print(f"{row['symbol']}: {row['id']}")
         raise
-    return df.set_index("symbol")["id"].to_dict()
+    return {row["symbol"]: row["id"] for row in rows}
+
+
+def query_chain(chain):
+    """
+    Pools and gauges of chain as (pools, gauges, BalPoolsGauges instance)
+    """
+    print(f"Generating pools and gauges for {chain}...")
+    pool_gauge_info = BalPoolsGauges(chain)
+    pools = process_query_pools(pool_gauge_info.query_all_pools())
+    gauges = process_query_gauges(pool_gauge_info.query_all_gauges())
+    return pools, gauges, pool_gauge_info
+
+
+def load_previous_output(name):
+    try:
+        with open(f"outputs/{name}.json", "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
 
 
 def main():
+    manifest = Manifest()
     pools = {}
     gauges = {}
     root_gauges = {}
 
     with open("extras/chains.json", "r") as f:
         chains = json.load(f)
+    results, failures = map_chains_isolated(
+        query_chain, chains["BALANCER_PRODUCTION_CHAINS"]
+    )
+    previous_pools = load_previous_output("pools")
+    previous_gauges = load_previous_output("gauges")
     for chain in chains["BALANCER_PRODUCTION_CHAINS"]:
-        print(f"Generating pools and gauges for {chain}...")
-        pool_gauge_info = BalPoolsGauges(chain)
-        # pools
-        result = process_query_pools(pool_gauge_info.query_all_pools())
-        if result:
-            pools[chain] = result
-        # gauges
-        result = process_query_gauges(pool_gauge_info.query_all_gauges())
-        if result:
-            gauges[chain] = result
-        # cache mainnet BalPoolsGauges
-        if chain == "mainnet":
-            gauge_info_mainnet = pool_gauge_info
+        if chain in failures:
+            # keep what we had for a chain that could not be queried
+            chain_pools = previous_pools.get(chain)
+            chain_gauges = previous_gauges.get(chain)
+        else:
+            chain_pools, chain_gauges, _ = results[chain]
+        if chain_pools:
+            pools[chain] = chain_pools
+        if chain_gauges:
+            gauges[chain] = chain_gauges
 
     # root gauges; only on mainnet
-    result = process_query_root_gauges(gauge_info_mainnet.query_root_gauges(), gauges)
-    if result:
-        root_gauges["mainnet"] = result
+    if "mainnet" in results:
+        gauge_info_mainnet = results["mainnet"][2]
+        query_root_gauges = gauge_info_mainnet.query_root_gauges()
+        children = root_gauge_children(query_root_gauges, gauges)
+        result = process_query_root_gauges(query_root_gauges, gauges)
+        if result:
+            root_gauges["mainnet"] = result
+    else:
+        children = load_previous_output("root_gauge_children")
+        root_gauges = load_previous_output("root_gauges")
+    report_failures(failures)
 
     # dump all collected dicts to json files
-    with open(f"outputs/pools.json", "w") as f:
-        json.dump(pools, f, indent=2)
-        f.write("\n")
-    with open("outputs/gauges.json", "w") as f:
-        json.dump(gauges, f, indent=2)
-        f.write("\n")
-    with open("outputs/root_gauges.json", "w") as f:
-        json.dump(root_gauges, f, indent=2)
-        f.write("\n")
+    manifest.write_json("outputs/pools.json", pools)
+    manifest.write_json("outputs/gauges.json", gauges)
+    manifest.write_json("outputs/root_gauges.json", root_gauges)
+    manifest.write_json("outputs/root_gauge_children.json", children)
+    manifest.save()
 
 
 if __name__ == "__main__":
@@ -1,48 +1,131 @@
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from bal_addresses.executor import DEFAULT_MAX_WORKERS, map_chains
+from bal_addresses.manifest import Manifest
 from bal_tools.subgraph import Subgraph
 
 
+SUBGRAPH_TYPES = [
+    "vault-v3",
+    "pools-v3",
+    "core",
+    "gauges",
+    "blocks",
+    "aura",
+]
+# smallest query every subgraph answers, cheaper than loading the playground with a GET
+PROBE_QUERY = {"query": "{ _meta { block { number } } }"}
+PROBE_TIMEOUT = float(os.getenv("SUBGRAPH_PROBE_TIMEOUT", 10))
+
+
+def resolve_urls(chain) -> dict:
+    """
+    {subgraph type: url} of the subgraphs known for chain
+    """
+    subgraph = Subgraph(chain)
+    urls = {}
+    for subgraph_type in SUBGRAPH_TYPES:
+        try:
+            url = subgraph.get_subgraph_url(subgraph_type)
+        except:
+            continue
+        if url:
+            urls[subgraph_type] = url
+    return urls
+
+
+def pooled_session(max_workers=DEFAULT_MAX_WORKERS) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def probe(session, url, timeout=PROBE_TIMEOUT) -> tuple:
+    """
+    (status code, latency in ms) of a _meta query against url.
+    The code is "timeout" or "error" if no response came back
+    """
+    start = time.perf_counter()
+    try:
+        code = session.post(url, json=PROBE_QUERY, timeout=timeout).status_code
+    except requests.Timeout:
+        code = "timeout"
+    except requests.RequestException:
+        code = "error"
+    return code, round((time.perf_counter() - start) * 1000)
+
+
+def probe_urls(urls, max_workers=DEFAULT_MAX_WORKERS, timeout=PROBE_TIMEOUT) -> dict:
+    """
+    {url: (status code, latency in ms)}, probing all urls concurrently over one session
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    with pooled_session(max_workers) as session, ThreadPoolExecutor(
+        max_workers=min(max_workers, len(urls))
+    ) as executor:
+        results = executor.map(lambda url: probe(session, url, timeout), urls)
+        return dict(zip(urls, results))
+
+
+def build_subgraph_urls(urls_by_chain, probes) -> dict:
+    """
+    {chain: {subgraph type: url}}.
+    Urls that did not answer with a 200 are kept as {code: url}
+    """
+    result = {}
+    for chain, urls in urls_by_chain.items():
+        result[chain] = {}
+        for subgraph_type, url in urls.items():
+            code, _ = probes[url]
+            result[chain][subgraph_type] = url if code == 200 else {code: url}
+    return result
+
+
+def build_subgraph_latency(urls_by_chain, probes) -> dict:
+    """
+    {chain: {subgraph type: latency in ms}} of the urls that answered with a 200
+    """
+    result = {}
+    for chain, urls in urls_by_chain.items():
+        latency = {
+            subgraph_type: probes[url][1]
+            for subgraph_type, url in urls.items()
+            if probes[url][0] == 200
+        }
+        if latency:
+            result[chain] = latency
+    return result
+
+
 def main():
+    manifest = Manifest()
     # make sure that if thegraph api key somehow finds its way into the env that it is wiped
     os.environ["GRAPH_API_KEY"] = ""
 
-    urls = {}
-
     with open("extras/chains.json", "r") as f:
         chains = json.load(f)
-    for chain in chains["CHAIN_IDS_BY_NAME"]:
-        if chain not in urls:
-            urls[chain] = {}
-        for subgraph_type in [
-            "vault-v3",
-            "pools-v3",
-            "core",
-            "gauges",
-            "blocks",
-            "aura",
-        ]:
-            subgraph = Subgraph(chain)
-            try:
-                url = subgraph.get_subgraph_url(subgraph_type)
-            except:
-                continue
-            if url:
-                print(url)
-                code = requests.get(url).status_code
-                if code == 200:
-                    urls[chain].update({subgraph_type: url})
-                else:
-                    urls[chain].update({subgraph_type: {code: url}})
-            else:
-                continue
+    urls_by_chain = map_chains(resolve_urls, chains["CHAIN_IDS_BY_NAME"])
+    probes = probe_urls(url for urls in urls_by_chain.values() for url in urls.values())
+    for url, (code, latency_ms) in probes.items():
+        print(f"{url} {code} {latency_ms}ms")
+    urls = build_subgraph_urls(urls_by_chain, probes)
 
     # dump the collected dict to json file
-    with open("outputs/subgraph_urls.json", "w") as f:
-        json.dump(urls, f, indent=2)
-        f.write("\n")
+    manifest.write_json("outputs/subgraph_urls.json", urls)
+    manifest.write_json(
+        "outputs/subgraph_latency.json", build_subgraph_latency(urls_by_chain, probes)
+    )
+    manifest.save()
 
 
 if __name__ == "__main__":
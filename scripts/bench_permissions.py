@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark BalPermissions construction on a synthetic action-ids.json.
+
+The default shape (300 deployments x 6 contracts x 8 functions, 14400 action ids)
+is a bit larger than the current mainnet action-ids.json.
+No network access is needed, the generated sources are placed in the source cache.
+
+Usage:
+    python scripts/bench_permissions.py
+    python scripts/bench_permissions.py --deployments 600 --repeat 5
+"""
+
+import argparse
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bal_addresses import BalPermissions  # noqa: E402
+from bal_addresses.cache import source_cache  # noqa: E402
+
+
+def synthetic_action_ids(deployments, contracts, functions):
+    action_ids = {}
+    for d in range(deployments):
+        deployment = f"2021{d:04d}-deployment-{d}"
+        action_ids[deployment] = {
+            f"Contract{c}": {
+                "useAdaptor": False,
+                "actionIds": {
+                    f"fx{f}(uint256)": "0x"
+                    + hashlib.sha256(f"{deployment}/{c}/{f}".encode()).hexdigest()
+                    for f in range(functions)
+                },
+            }
+            for c in range(contracts)
+        }
+    return action_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chain", default="mainnet")
+    parser.add_argument("--deployments", type=int, default=300)
+    parser.add_argument("--contracts", type=int, default=6)
+    parser.add_argument("--functions", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    action_ids = synthetic_action_ids(args.deployments, args.contracts, args.functions)
+    n = args.deployments * args.contracts * args.functions
+    permissions_url, action_ids_url = (
+        url for url, _ in BalPermissions.sources(args.chain)
+    )
+    timings = []
+    for _ in range(args.repeat):
+        source_cache.clear()
+        source_cache.set(permissions_url, {})
+        source_cache.set(action_ids_url, action_ids)
+        start = time.perf_counter()
+        BalPermissions(args.chain)
+        timings.append(time.perf_counter() - start)
+    print(f"BalPermissions({args.chain}) with {n} action ids: {min(timings):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
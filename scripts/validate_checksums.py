@@ -3,23 +3,39 @@
 Validate that all Ethereum addresses in JSON files are checksummed (EIP-55).
 Exits with code 1 if any address is not checksummed or invalid.
 
+Files are validated in parallel processes. Results are cached in .checksum_cache.json
+by file content hash, so unchanged files are not parsed again on the next run.
+
 Usage:
-    python validate_checksums.py              # Validate extras/*.json
+    python validate_checksums.py              # Validate config/*.json and extras/*.json
     python validate_checksums.py --fix        # Fix addresses in-place
     python validate_checksums.py file.json    # Validate specific file(s)
+    python validate_checksums.py outputs      # Validate all JSON files below a directory
+    python validate_checksums.py --no-cache   # Ignore and don't update the cache
 """
 
 import argparse
+import hashlib
 import json
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 from eth_utils import is_checksum_address, to_checksum_address, is_hex_address
 
 ETH_ADDRESS_PATTERN = re.compile(r"^0x[a-fA-F0-9]{40}$")
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+DEFAULT_CACHE_PATH = Path(".checksum_cache.json")
+# bump whenever the validation rules change, invalidates every cached result
+CACHE_VERSION = 1
+MAX_CACHE_ENTRIES = 10000
 
 
+@lru_cache(maxsize=None)
 def _checksum_str(s):
     """Checksum a string if it's an Ethereum address, otherwise return as-is."""
     if ETH_ADDRESS_PATTERN.match(s) and is_hex_address(s):
@@ -27,6 +43,25 @@ def _checksum_str(s):
     return s
 
 
+@lru_cache(maxsize=None)
+def address_issue(address: str) -> Optional[str]:
+    """
+    What is wrong with an address, None if it is fine.
+    Memoized, the same address shows up in many files.
+    """
+    # Skip zero address
+    if address == ZERO_ADDRESS:
+        return None
+    if not is_hex_address(address):
+        return "Invalid hex address"
+    if not is_checksum_address(address):
+        try:
+            return f"Should be: {to_checksum_address(address)}"
+        except Exception as e:
+            return f"Cannot checksum: {e}"
+    return None
+
+
 def checksum_addresses_in_obj(obj):
     """Recursively checksum all Ethereum addresses in a JSON object (keys and values)."""
     if isinstance(obj, dict):
@@ -59,38 +94,101 @@ def find_addresses_in_obj(obj, path=""):
     return addresses
 
 
-def validate_json_file(filepath: Path) -> list[tuple[str, str, str]]:
+def validate_json_content(content: bytes) -> list[tuple[str, str, str]]:
     """
-    Validate all addresses in a JSON file.
+    Validate all addresses in the content of a JSON file.
     Returns list of (path, address, issue) tuples for invalid/non-checksummed addresses.
     """
-    issues = []
-
     try:
-        with open(filepath) as f:
-            data = json.load(f)
+        data = json.loads(content)
     except json.JSONDecodeError as e:
         return [("", "", f"Invalid JSON: {e}")]
 
-    addresses = find_addresses_in_obj(data)
+    issues = []
+    for json_path, address in find_addresses_in_obj(data):
+        issue = address_issue(address)
+        if issue:
+            issues.append((json_path, address, issue))
+    return issues
 
-    for json_path, address in addresses:
-        # Skip zero address
-        if address == "0x0000000000000000000000000000000000000000":
-            continue
 
-        if not is_hex_address(address):
-            issues.append((json_path, address, "Invalid hex address"))
-            continue
+def validate_json_file(filepath: Path) -> list[tuple[str, str, str]]:
+    """
+    Validate all addresses in a JSON file.
+    Returns list of (path, address, issue) tuples for invalid/non-checksummed addresses.
+    """
+    with open(filepath, "rb") as f:
+        return validate_json_content(f.read())
 
-        if not is_checksum_address(address):
-            try:
-                checksummed = to_checksum_address(address)
-                issues.append((json_path, address, f"Should be: {checksummed}"))
-            except Exception as e:
-                issues.append((json_path, address, f"Cannot checksum: {e}"))
 
-    return issues
+class ChecksumCache:
+    """
+    Validation results by sha256 of the file content, persisted as json between runs
+    """
+
+    def __init__(self, path: Optional[Path] = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        if path is None:
+            return
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if cached.get("version") == CACHE_VERSION:
+            self.entries = cached["results"]
+
+    def get(self, content_hash: str) -> Optional[list[tuple[str, str, str]]]:
+        issues = self.entries.pop(content_hash, None)
+        if issues is None:
+            return None
+        # keep recently used entries at the end, they survive trimming
+        self.entries[content_hash] = issues
+        return [tuple(issue) for issue in issues]
+
+    def set(self, content_hash: str, issues: list[tuple[str, str, str]]) -> None:
+        self.entries.pop(content_hash, None)
+        self.entries[content_hash] = [list(issue) for issue in issues]
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        results = dict(list(self.entries.items())[-MAX_CACHE_ENTRIES:])
+        with open(self.path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "results": results}, f)
+
+
+def validate_files(
+    filepaths: list[Path], cache: ChecksumCache, jobs: Optional[int] = None
+) -> dict[Path, list[tuple[str, str, str]]]:
+    """
+    {file: issues} of every file, in the order of filepaths.
+    Files not in the cache are validated in up to `jobs` processes.
+    """
+    results = {}
+    pending = {}
+    for filepath in filepaths:
+        with open(filepath, "rb") as f:
+            content = f.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+        results[filepath] = cache.get(content_hash)
+        if results[filepath] is None:
+            pending[filepath] = (content_hash, content)
+
+    contents = [content for _, content in pending.values()]
+    if len(pending) > 1 and jobs != 1:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs or os.cpu_count(), len(pending))
+        ) as executor:
+            validated = list(executor.map(validate_json_content, contents))
+    else:
+        validated = [validate_json_content(content) for content in contents]
+
+    for (filepath, (content_hash, _)), issues in zip(pending.items(), validated):
+        cache.set(content_hash, issues)
+        results[filepath] = issues
+    return results
 
 
 def fix_json_file(filepath: Path) -> tuple[int, list[tuple[str, str]]]:
@@ -110,11 +208,11 @@ def fix_json_file(filepath: Path) -> tuple[int, list[tuple[str, str]]]:
     non_checksummed = 0
 
     for json_path, addr in addresses:
-        if addr == "0x0000000000000000000000000000000000000000":
+        if addr == ZERO_ADDRESS:
             continue
         if not is_hex_address(addr):
             invalid.append((json_path, addr))
-        elif not is_checksum_address(addr):
+        elif address_issue(addr):
             non_checksummed += 1
 
     if non_checksummed == 0:
@@ -141,30 +239,59 @@ def main():
         help="Fix addresses in-place instead of validating",
     )
     parser.add_argument(
-        "files", nargs="*", help="JSON files to process (default: extras/*.json)"
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of processes to validate with (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=DEFAULT_CACHE_PATH,
+        help=f"Cache of earlier results (default: {DEFAULT_CACHE_PATH})",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Ignore and don't update the cache"
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="JSON files or directories to process (default: config/*.json and extras/*.json)",
     )
     args = parser.parse_args()
 
     # Collect JSON files
-    json_files = []
+    json_files = set()
     if args.files:
-        json_files = [Path(f) for f in args.files if f.endswith(".json")]
+        for f in args.files:
+            path = Path(f)
+            if path.is_dir():
+                json_files.update(path.rglob("*.json"))
+            elif f.endswith(".json"):
+                json_files.add(path)
     else:
         for dir_name in ["config", "extras"]:
             dir_path = Path(dir_name)
             if dir_path.exists():
-                json_files.extend(dir_path.glob("*.json"))
+                json_files.update(dir_path.glob("*.json"))
+    json_files = sorted(json_files)
 
     if not json_files:
         print("No JSON files to process")
         sys.exit(0)
 
+    cache = ChecksumCache(None if args.no_cache else args.cache)
+    results = validate_files(json_files, cache, args.jobs)
+    cache.save()
+
     if args.fix:
-        # Fix mode
+        # Fix mode, files without issues are left alone
         total_fixed = 0
         all_invalid = []
 
-        for filepath in sorted(json_files):
+        for filepath in json_files:
+            if not results[filepath]:
+                continue
             fixed, invalid = fix_json_file(filepath)
             if fixed > 0:
                 print(f"Fixed {fixed} address(es) in {filepath}")
@@ -187,12 +314,9 @@ def main():
         sys.exit(0)
     else:
         # Validate mode
-        all_issues = []
-
-        for filepath in sorted(json_files):
-            issues = validate_json_file(filepath)
-            if issues:
-                all_issues.append((filepath, issues))
+        all_issues = [
+            (filepath, issues) for filepath, issues in results.items() if issues
+        ]
 
         if all_issues:
             print("Address checksum validation failed!\n")
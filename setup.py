@@ -14,7 +14,7 @@ setup(
     long_description=LONG_DESCRIPTION,
     packages=find_packages(),
     include_package_data=True,  # Automatically include non-Python files
-    package_data={"": ["abis/*.json"]},
+    package_data={"": ["abis/*.json", "chains.json"]},
     url="https://github.com/balancer/bal_addresses",
     install_requires=[
         "bal_tools @ git+https://github.com/balancer/bal_tools.git",
@@ -25,6 +25,7 @@ setup(
         "brownie": [
             "bal_tools[brownie] @ git+https://github.com/balancer/bal_tools.git"
         ],
+        "async": ["aiohttp"],
     },
     keywords=["python", "first package"],
     classifiers=[
@@ -1,9 +1,19 @@
 import pytest
 
-from bal_addresses import AddrBook
+from bal_addresses import AddrBook, source_cache
 
 
 @pytest.fixture(scope="module", params=list(AddrBook.chains["CHAIN_IDS_BY_NAME"]))
 def chain(request):
     chain = request.param
     return chain
+
+
+@pytest.fixture(autouse=True)
+def clear_source_cache():
+    """
+    Sources are cached process wide, make sure mocked responses don't leak between tests
+    """
+    source_cache.clear()
+    yield
+    source_cache.clear()
@@ -0,0 +1,234 @@
+"""
+In process JSON-RPC stand-in for a chain with an Authorizer and Multicall3 deployed.
+Every grant or revoke is mined in a block of its own and logged like the Authorizer does,
+calls are answered with the state at the block they ask for.
+Contracts are emulated at the ABI level, so calls go through web3's real encoding,
+decoding and request handling without needing a compiler or an EVM.
+"""
+
+from eth_abi import decode, encode
+from eth_utils import (
+    function_signature_to_4byte_selector,
+    keccak,
+    to_checksum_address,
+)
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from bal_addresses.multicall import MULTICALL3_ADDRESS
+
+AUTHORIZER_ADDRESS = "0xA331D84eC860Bf466b4CdCcFb4aC09a1B43F3aE6"
+
+
+def selector(signature):
+    return function_signature_to_4byte_selector(signature)
+
+
+class Revert(Exception):
+    pass
+
+
+class AuthorizerStandIn:
+    """
+    Role members kept like OpenZeppelin's EnumerableSet (append on grant, swap and pop on revoke)
+    """
+
+    def __init__(self):
+        self.members = {}
+        # (block, members) after every change, oldest first
+        self.history = [(0, {})]
+
+    def snapshot(self, block):
+        self.history.append(
+            (block, {role: list(members) for role, members in self.members.items()})
+        )
+
+    def members_at(self, block):
+        return next(members for b, members in reversed(self.history) if b <= block)
+
+    def grant(self, role, account) -> bool:
+        members = self.members.setdefault(role, [])
+        if account in members:
+            return False
+        members.append(account)
+        return True
+
+    def revoke(self, role, account) -> bool:
+        members = self.members.get(role, [])
+        if account not in members:
+            return False
+        i = members.index(account)
+        members[i] = members[-1]
+        members.pop()
+        return True
+
+    def __call__(self, data, block):
+        members_by_role = self.members_at(block)
+        if data[:4] == selector("getRoleMemberCount(bytes32)"):
+            (role,) = decode(["bytes32"], data[4:])
+            return encode(["uint256"], [len(members_by_role.get(role, []))])
+        if data[:4] == selector("getRoleMember(bytes32,uint256)"):
+            role, index = decode(["bytes32", "uint256"], data[4:])
+            members = members_by_role.get(role, [])
+            if index >= len(members):
+                raise Revert("index out of bounds")
+            return encode(["address"], [members[index]])
+        raise Revert("unknown selector")
+
+
+class EVMStandIn(BaseProvider):
+    """
+    Answers eth_call for the registered contracts, counting every request by method.
+    The finalized block trails the head by finality blocks (unknown to the node if None),
+    get_logs rejects ranges wider than max_log_range blocks
+    """
+
+    def __init__(self, multicall=True, finality=0, max_log_range=None):
+        super().__init__()
+        self.authorizer = AuthorizerStandIn()
+        self.contracts = {AUTHORIZER_ADDRESS.lower(): self.authorizer}
+        if multicall:
+            self.contracts[MULTICALL3_ADDRESS.lower()] = self.aggregate3
+        self.requests = []
+        self.block = 1
+        self.logs = []
+        self.finality = finality
+        self.max_log_range = max_log_range
+
+    def _log(self, event, role, account):
+        self.block += 1
+        self.authorizer.snapshot(self.block)
+        topic = keccak(text=f"{event}(bytes32,address,address)")
+        self.logs.append(
+            {
+                "address": AUTHORIZER_ADDRESS,
+                "topics": [
+                    "0x" + topic.hex(),
+                    role,
+                    "0x" + encode(["address"], [account]).hex(),
+                    "0x" + encode(["address"], [account]).hex(),
+                ],
+                "data": "0x",
+                "blockNumber": hex(self.block),
+                "blockHash": "0x" + f"{self.block:064x}",
+                "transactionHash": "0x" + f"{self.block:064x}",
+                "transactionIndex": "0x0",
+                "logIndex": "0x0",
+                "removed": False,
+            }
+        )
+
+    def grant(self, role, account):
+        if self.authorizer.grant(bytes.fromhex(role[2:]), account):
+            self._log("RoleGranted", role, account)
+
+    def revoke(self, role, account):
+        if self.authorizer.revoke(bytes.fromhex(role[2:]), account):
+            self._log("RoleRevoked", role, account)
+
+    def count(self, method):
+        return sum(1 for m, _ in self.requests if m == method)
+
+    def w3(self):
+        return Web3(self)
+
+    def mine(self, blocks=1):
+        self.block += blocks
+
+    def aggregate3(self, data, block):
+        if data[:4] != selector("aggregate3((address,bool,bytes)[])"):
+            raise Revert("unknown selector")
+        (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+        results = []
+        for target, allow_failure, call_data in calls:
+            try:
+                results.append((True, self.contracts[target.lower()](call_data, block)))
+            except (Revert, KeyError):
+                if not allow_failure:
+                    raise Revert("call failed")
+                results.append((False, b""))
+        return encode(["(bool,bytes)[]"], [results])
+
+    def is_connected(self, show_traceback=False):
+        return True
+
+    def block_number(self, tag):
+        if tag in ("latest", "pending"):
+            return self.block
+        if tag in ("finalized", "safe"):
+            return self.block - self.finality
+        return int(tag, 16)
+
+    def make_request(self, method, params):
+        self.requests.append((method, params))
+        if method == "eth_chainId":
+            return {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(self.block)}
+        if method == "eth_getBlockByNumber":
+            if params[0] in ("finalized", "safe") and self.finality is None:
+                return {
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "error": {"code": -32000, "message": "unknown block tag"},
+                }
+            number = self.block_number(params[0])
+            return {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "result": {"number": hex(number), "hash": "0x" + f"{number:064x}"},
+            }
+        if method == "eth_getLogs":
+            (log_filter,) = params
+            from_block = int(log_filter["fromBlock"], 16)
+            to_block = int(log_filter["toBlock"], 16)
+            if self.max_log_range and to_block - from_block + 1 > self.max_log_range:
+                return {
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "error": {"code": -32005, "message": "block range too wide"},
+                }
+            topics = log_filter["topics"][0]
+            addresses = log_filter["address"]
+            if isinstance(addresses, str):
+                addresses = [addresses]
+            addresses = {address.lower() for address in addresses}
+            logs = [
+                log
+                for log in self.logs
+                if from_block <= int(log["blockNumber"], 16) <= to_block
+                and log["address"].lower() in addresses
+                and log["topics"][0] in topics
+            ]
+            return {"jsonrpc": "2.0", "id": 1, "result": logs}
+        if method == "eth_getCode":
+            code = "0x00" if params[0].lower() in self.contracts else "0x"
+            return {"jsonrpc": "2.0", "id": 1, "result": code}
+        if method == "eth_call":
+            tx = params[0]
+            contract = self.contracts.get(tx["to"].lower())
+            try:
+                if contract is None:
+                    return {"jsonrpc": "2.0", "id": 1, "result": "0x"}
+                data = bytes.fromhex(tx["data"][2:])
+                block = self.block_number(params[1])
+                return {
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "result": "0x" + contract(data, block).hex(),
+                }
+            except Revert as e:
+                return {
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "error": {"code": 3, "message": f"execution reverted: {e}"},
+                }
+        raise NotImplementedError(method)
+
+
+def account(i):
+    return to_checksum_address(f"0x{i:040x}")
+
+
+def role(i):
+    return "0x" + f"{i:064x}"
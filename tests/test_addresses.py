@@ -1,7 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+
 import pytest
+import requests
 import responses
 
-from bal_addresses import AddrBook
+from bal_addresses import AddrBook, MultipleMatchesError, NoResultError
+from bal_addresses.addresses import (
+    BUNDLED_CHAINS,
+    FLATBOOK_NAMESPACES,
+    GITHUB_RAW_EXTRAS,
+    build_flatbooks,
+    build_global_reverse_index,
+)
 
 
 @responses.activate
@@ -163,3 +176,312 @@ def test_deployments_not_populated():
     assert a.multisigs == {}
     with pytest.raises(AttributeError):
         assert a.multisigs.non_existing_attribute
+
+
+def test_bundled_chains_match_extras():
+    """
+    The chains.json shipped with the package must be kept in sync with extras/chains.json
+    """
+    with open(BUNDLED_CHAINS) as bundled, open("extras/chains.json") as extras:
+        assert json.load(bundled) == json.load(extras)
+
+
+def test_import_does_no_network_io(tmp_path):
+    code = (
+        "import socket\n"
+        "def fail(*args, **kwargs):\n"
+        "    raise AssertionError('network access')\n"
+        "socket.socket.connect = fail\n"
+        "socket.getaddrinfo = fail\n"
+        "import bal_addresses\n"
+        "assert 'mainnet' in bal_addresses.AddrBook.chain_ids_by_name\n"
+    )
+    # run outside the repo so the bundled chains.json is used
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+
+
+@responses.activate
+def test_flatbook_is_loaded_per_namespace():
+    responses.add(
+        responses.GET,
+        "https://raw.githubusercontent.com/balancer"
+        "/bal_addresses/main/outputs/deployments.json",
+        json={},
+    )
+    responses.add(
+        responses.GET,
+        "https://raw.githubusercontent.com/balancer"
+        "/balancer-deployments/master/addresses/mainnet.json",
+        json={
+            "20210418-authorizer": {
+                "contracts": [
+                    {
+                        "name": "Authorizer",
+                        "address": "0xA331D84eC860Bf466b4CdCcFb4aC09a1B43F3aE6",
+                    }
+                ],
+                "status": "ACTIVE",
+            }
+        },
+    )
+    a = AddrBook("mainnet")
+    result = a.search_unique(
+        "20210418-authorizer/Authorizer", namespaces=["deployments"]
+    )
+    assert result.address == "0xA331D84eC860Bf466b4CdCcFb4aC09a1B43F3aE6"
+    # only deployments.json and the chain deployments have been fetched
+    assert len(responses.calls) == 2
+    with pytest.raises(ValueError):
+        a.search_unique("Authorizer", namespaces="deployments")
+    with pytest.raises(ValueError):
+        a.search_many("Authorizer", namespaces=["deployments", "deployment"])
+
+
+def test_deployment_label_takes_precedence():
+    a = AddrBook.__new__(AddrBook)
+    a.chain = "mainnet"
+    a._flat_namespaces = {
+        "pools": {
+            "pools/B-80BAL-20WETH-5c6e": "0x5c6Ee304399DBdB9C8Ef030aB642B10820DB8F56"
+        },
+        "deployments": {
+            "20210418-vault/Vault": "0xBA12222222228d8Ba445958a75a0704d566BF2C8",
+            "20220101-pool/Pool": "0x5c6Ee304399DBdB9C8Ef030aB642B10820DB8F56",
+        },
+    }
+    for namespace in [
+        "gauges",
+        "root_gauges",
+        "extras",
+        "multisigs",
+        "EOA",
+        "rate_providers",
+    ]:
+        a._flat_namespaces[namespace] = {}
+    a._flatbook = None
+    a._reversebook = None
+    assert list(a.flatbook) == [
+        "pools/B-80BAL-20WETH-5c6e",
+        "20210418-vault/Vault",
+        "20220101-pool/Pool",
+    ]
+    assert (
+        a.reversebook["0x5c6Ee304399DBdB9C8Ef030aB642B10820DB8F56"]
+        == "20220101-pool/Pool"
+    )
+
+
+def test_search_does_not_depend_on_call_history():
+    """
+    Searches answer from the whole flatbook whether or not it was loaded before,
+    only an explicit namespaces argument narrows them down
+    """
+
+    def book():
+        a = AddrBook.__new__(AddrBook)
+        a.chain = "mainnet"
+        a._flat_namespaces = {namespace: {} for namespace in FLATBOOK_NAMESPACES}
+        a._flat_namespaces["pools"] = {
+            "pools/20210418-vault-LP-5c6e": "0x5c6Ee304399DBdB9C8Ef030aB642B10820DB8F56"
+        }
+        a._flat_namespaces["deployments"] = {
+            "20210418-vault/Vault": "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+        }
+        a._flatbook = None
+        a._reversebook = None
+        a._search_indexes = {}
+        return a
+
+    fresh = book()
+    loaded = book()
+    loaded.flatbook
+    for a in [fresh, loaded]:
+        assert [r.path for r in a.search_many("20210418-vault")] == [
+            "pools/20210418-vault-LP-5c6e",
+            "20210418-vault/Vault",
+        ]
+        with pytest.raises(MultipleMatchesError):
+            a.search_unique("20210418-vault")
+        assert (
+            a.search_unique("20210418-vault", namespaces=["deployments"]).path
+            == "20210418-vault/Vault"
+        )
+
+
+def test_flatten_dict():
+    a = AddrBook.__new__(AddrBook)
+    nested = {"a": {"b": {"c": 1}, "d": 2}, "e": 3, "f": {}}
+    assert a.flatten_dict(nested) == {"a/b/c": 1, "a/d": 2, "e": 3}
+    assert list(a.flatten_dict(nested, "x")) == ["x/a/b/c", "x/a/d", "x/e"]
+
+
+@responses.activate
+def test_contract_versions(monkeypatch, tmp_path):
+    responses.add(
+        responses.GET,
+        "https://raw.githubusercontent.com/balancer"
+        "/bal_addresses/main/outputs/deployments.json",
+        json={
+            "active": {
+                "mainnet": {
+                    "20241204-v3-vault": {
+                        "Vault": "0xbA1333333333a1BA1108E8412f11850A5C319bA9"
+                    },
+                    "00000000-tokens": {
+                        "WETH": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+                        "NotListed": "0x0000000000000000000000000000000000000001",
+                    },
+                },
+                "arbitrum": {
+                    "20210418-vault": {
+                        "Vault": "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+                    },
+                },
+            },
+            "old": {
+                "mainnet": {
+                    "20210418-vault": {
+                        "Vault": "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+                    },
+                },
+            },
+        },
+    )
+    a = AddrBook("mainnet")
+    a.flatbook = {
+        "20210418-vault/Vault": "0xBA12222222228d8Ba445958a75a0704d566BF2C8",
+        "20241204-v3-vault/Vault": "0xbA1333333333a1BA1108E8412f11850A5C319bA9",
+        "tokens/WETH": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+    }
+    assert a.latest_contract("Vault") == {
+        "path": "20241204-v3-vault/Vault",
+        "address": "0xbA1333333333a1BA1108E8412f11850A5C319bA9",
+    }
+    # the path is the one the address is listed under in the flatbook
+    assert a.latest_contract("WETH") == {
+        "path": "tokens/WETH",
+        "address": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+    }
+    assert a.search_unique(a.latest_contract("WETH").path).address == (
+        "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+    )
+    with pytest.raises(NoResultError):
+        a.latest_contract("NotListed")
+    assert [v.path for v in a.all_versions("Vault")] == [
+        "20241204-v3-vault/Vault",
+        "20210418-vault/Vault",
+    ]
+    with pytest.raises(NoResultError):
+        a.latest_contract("NotAContract")
+
+    # the published reverse books of every chain the contract is deployed on
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("outputs")
+    reversebooks = {
+        "mainnet": {
+            "0xbA1333333333a1BA1108E8412f11850A5C319bA9": "20241204-v3-vault/Vault",
+            "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2": "tokens/WETH",
+        },
+        "arbitrum": {
+            "0xBA12222222228d8Ba445958a75a0704d566BF2C8": "20210418-vault/Vault"
+        },
+    }
+    for chain, reversebook in reversebooks.items():
+        with open(f"outputs/{chain}_reverse.json", "w") as f:
+            json.dump(reversebook, f)
+    latest = AddrBook.latest_contract_all_chains("Vault")
+    assert latest["mainnet"].path == "20241204-v3-vault/Vault"
+    assert latest["arbitrum"].path == "20210418-vault/Vault"
+    assert latest["gnosis"] is None
+    # same path as latest_contract, not the 00000000-tokens deployment path
+    latest = AddrBook.latest_contract_all_chains("WETH")
+    assert latest["mainnet"] == a.latest_contract("WETH")
+    assert latest["arbitrum"] is None
+    assert AddrBook.latest_contract_all_chains("NotListed")["mainnet"] is None
+    # a single download of deployments.json serves every chain
+    assert len(responses.calls) == 1
+
+
+def test_get_address_all_chains_from_index():
+    result = AddrBook.get_address_all_chains("multisigs/dao", use_index=True)
+    assert list(result) == list(AddrBook.chain_ids_by_name)
+    for chain, info in result.items():
+        if not os.path.exists(f"outputs/{chain}.json"):
+            continue
+        with open(f"outputs/{chain}.json") as f:
+            expected = json.load(f).get("multisigs/dao")
+        if expected is None:
+            assert info is None
+        else:
+            assert info == {"path": "multisigs/dao", "address": expected}
+    with pytest.raises(MultipleMatchesError):
+        AddrBook.get_address_all_chains("multisigs/", use_index=True)
+
+
+def test_build_global_reverse_index():
+    books = {
+        "mainnet": {
+            "b/vault": "0xba12222222228d8ba445958a75a0704d566bf2c8",
+            "a/vault": "0xBA12222222228d8Ba445958a75a0704d566BF2C8",
+        },
+        "arbitrum": {
+            "vault/Vault": "0xBA12222222228d8Ba445958a75a0704d566BF2C8",
+            "extras/note": "hello",
+            "extras/threshold": 3,
+        },
+    }
+    assert build_global_reverse_index(books) == {
+        "0xBA12222222228d8Ba445958a75a0704d566BF2C8": [
+            ["arbitrum", "vault/Vault"],
+            ["mainnet", "a/vault"],
+            ["mainnet", "b/vault"],
+        ]
+    }
+
+
+def test_reverse_lookup_all_chains():
+    results = AddrBook.reverse_lookup_all_chains(
+        "0xba12222222228d8ba445958a75a0704d566bf2c8"
+    )
+    assert {"chain": "mainnet", "path": "20210418-vault/Vault"} in results
+    assert {r.chain for r in results} >= {"mainnet", "arbitrum", "polygon"}
+    assert AddrBook.reverse_lookup_all_chains("0x" + "ab" * 20) == []
+    assert AddrBook.reverse_lookup_all_chains("hello") == []
+
+
+@responses.activate
+def test_build_flatbooks():
+    chains = ["mainnet", "arbitrum"]
+    remote = {
+        url
+        for chain in chains
+        for url, local_path in AddrBook.sources(chain)
+        if local_path is None
+    }
+    for url in remote:
+        responses.add(responses.GET, url, json={})
+    flatbooks, failures = build_flatbooks(chains)
+    assert failures == {}
+    assert list(flatbooks) == chains
+    # every source is downloaded once for the whole batch
+    assert len(responses.calls) == len(remote)
+    for chain in chains:
+        assert flatbooks[chain] == AddrBook(chain).generate_flatbook()
+    assert "pools/B-80BAL-20WETH-5c6e" in flatbooks["mainnet"]
+
+
+@responses.activate
+def test_build_flatbooks_reports_namespaces_that_failed_to_load():
+    chains = ["mainnet", "arbitrum"]
+    broken = f"{GITHUB_RAW_EXTRAS}/arbitrum.json"
+    for chain in chains:
+        for url, local_path in AddrBook.sources(chain):
+            if local_path is None and url != broken:
+                responses.add(responses.GET, url, json={})
+    responses.add(responses.GET, broken, body=requests.ConnectionError("offline"))
+    flatbooks, failures = build_flatbooks(chains)
+    assert list(flatbooks) == ["mainnet"]
+    assert isinstance(failures["arbitrum"], requests.ConnectionError)
+    # outside of strict mode the namespace is left empty
+    assert AddrBook("arbitrum").flatten_namespace("extras") == {}
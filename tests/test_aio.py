@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from bal_addresses import (
+    AsyncAddrBook,
+    AsyncBalPermissions,
+    RateProviders,
+    addresses,
+    cache,
+    permissions,
+)
+from bal_addresses.aio import prefetch
+
+web = pytest.importorskip("aiohttp.web")
+
+ACTION_ID = "0x3a0fd4e6b4b9c6e2cc6a9d3d0e3c4a1b67d8d3b7e8f4c3e2a1b0c9d8e7f6a5b4"
+FILES = {
+    "/outputs/deployments.json": {
+        "active": {
+            "mainnet": {
+                "20210418-vault": {
+                    "Vault": "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+                }
+            }
+        },
+        "old": {},
+    },
+    "/deployments/addresses/mainnet.json": {
+        "20210418-vault": {
+            "contracts": [
+                {
+                    "name": "Vault",
+                    "address": "0xBA12222222228d8Ba445958a75a0704d566BF2C8",
+                }
+            ],
+            "status": "ACTIVE",
+        }
+    },
+    "/extras/multisigs.json": {
+        "mainnet": {"dao": "0x10A19e7eE7d7F8a52822f6817de8ea18204F2e4f"}
+    },
+    "/extras/signers.json": {},
+    "/registry.json": {},
+    "/outputs/permissions/active/mainnet.json": {
+        ACTION_ID: ["0x10A19e7eE7d7F8a52822f6817de8ea18204F2e4f"]
+    },
+    "/deployments/action-ids/mainnet/action-ids.json": {
+        "20210418-vault": {
+            "Vault": {
+                "useAdaptor": False,
+                "actionIds": {"setRelayerApproval(address,address,bool)": ACTION_ID},
+            }
+        }
+    },
+}
+
+
+async def serve(files):
+    async def handler(request):
+        if request.path in files:
+            return web.json_response(files[request.path])
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def patch_sources(monkeypatch):
+    def patch(base):
+        for module in [addresses, permissions]:
+            monkeypatch.setattr(module, "GITHUB_RAW_OUTPUTS", f"{base}/outputs")
+            monkeypatch.setattr(module, "GITHUB_DEPLOYMENTS_RAW", f"{base}/deployments")
+        monkeypatch.setattr(addresses, "GITHUB_RAW_EXTRAS", f"{base}/extras")
+        monkeypatch.setattr(
+            RateProviders, "source_url", staticmethod(lambda: f"{base}/registry.json")
+        )
+
+        def no_blocking_io(url):
+            raise AssertionError(f"blocking fetch of {url}")
+
+        monkeypatch.setattr(cache, "fetch_json", no_blocking_io)
+
+    yield patch
+
+
+def test_async_load(patch_sources):
+    async def main():
+        runner, base = await serve(FILES)
+        patch_sources(base)
+        try:
+            book, perms = await asyncio.gather(
+                AsyncAddrBook.load("mainnet"), AsyncBalPermissions.load("mainnet")
+            )
+        finally:
+            await runner.cleanup()
+        return book, perms
+
+    book, perms = asyncio.run(main())
+    assert book.search_unique("20210418-vault/Vault").address == (
+        "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+    )
+    assert (
+        book.flatbook["multisigs/dao"] == "0x10A19e7eE7d7F8a52822f6817de8ea18204F2e4f"
+    )
+    assert (
+        book.reversebook["0x10A19e7eE7d7F8a52822f6817de8ea18204F2e4f"]
+        == "multisigs/dao"
+    )
+    assert book.latest_contract("Vault").path == "20210418-vault/Vault"
+    assert perms.allowed_addresses(ACTION_ID) == [
+        "0x10A19e7eE7d7F8a52822f6817de8ea18204F2e4f"
+    ]
+
+
+def test_prefetch_caches_missing_but_not_failed_sources():
+    async def main():
+        async def handler(request):
+            return web.Response(status=503 if request.path == "/down.json" else 404)
+
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        try:
+            await prefetch(
+                [(f"{base}/missing.json", None), (f"{base}/down.json", None)]
+            )
+        finally:
+            await runner.cleanup()
+        return base
+
+    base = asyncio.run(main())
+    assert f"{base}/missing.json" in cache.source_cache
+    assert f"{base}/down.json" not in cache.source_cache
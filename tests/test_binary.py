@@ -0,0 +1,117 @@
+import json
+import os
+
+import pytest
+import requests
+import responses
+
+from bal_addresses import BinaryAddrBook, to_checksum_address
+from bal_addresses import binary
+from bal_addresses.addresses import GITHUB_RAW_OUTPUTS
+from bal_addresses.binary import binary_addrbook_path, pack_addrbook
+
+VAULT = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+AUTHORIZER = "0xA331D84eC860Bf466b4CdCcFb4aC09a1B43F3aE6"
+FLATBOOK = {
+    "20210418-vault/Vault": VAULT,
+    "20210418-authorizer/Authorizer": AUTHORIZER,
+    "multisigs/dao": VAULT.lower(),
+    "pools/B-80BAL-20WETH-ü": "0x5c6Ee304399DBdB9C8Ef030aB642B10820DB8F56",
+}
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = tmp_path / "mainnet.addrbook"
+    path.write_bytes(pack_addrbook(FLATBOOK))
+    with BinaryAddrBook(str(path)) as book:
+        yield book
+
+
+def test_lookups(book):
+    assert len(book) == 4
+    assert book.address("20210418-authorizer/Authorizer") == AUTHORIZER
+    # addresses come back checksummed
+    assert book.address("multisigs/dao") == VAULT
+    assert book.address("pools/B-80BAL-20WETH-ü") == (
+        "0x5c6Ee304399DBdB9C8Ef030aB642B10820DB8F56"
+    )
+    assert book.address("20210418-vault") is None
+    # the last name of an address wins, like in {chain}_reverse.json
+    assert book.name(VAULT) == "multisigs/dao"
+    assert book.name(AUTHORIZER.lower()) == "20210418-authorizer/Authorizer"
+    assert book.name("0x" + "00" * 20) is None
+    assert book.name("not an address") is None
+    assert book.name("1x" + VAULT[2:]) is None
+    assert "multisigs/dao" in book
+
+
+def test_iterates_like_the_json_book(book):
+    assert list(book) == sorted(FLATBOOK)
+    assert dict(book.items()) == {
+        name: to_checksum_address(address) for name, address in FLATBOOK.items()
+    }
+
+
+def test_reversebook_picks_the_name(tmp_path):
+    path = tmp_path / "mainnet.addrbook"
+    path.write_bytes(pack_addrbook(FLATBOOK, {VAULT: "20210418-vault/Vault"}))
+    with BinaryAddrBook(str(path)) as book:
+        assert book.name(VAULT) == "20210418-vault/Vault"
+
+
+def test_non_address_values_are_left_out(tmp_path):
+    path = tmp_path / "mainnet.addrbook"
+    flatbook = {**FLATBOOK, "extras/threshold": 3, "extras/note": "not an address"}
+    path.write_bytes(pack_addrbook(flatbook, {"not an address": "extras/note"}))
+    with BinaryAddrBook(str(path)) as book:
+        assert list(book) == sorted(FLATBOOK)
+        assert book.address("extras/threshold") is None
+
+
+@responses.activate
+def test_cached_copy_is_used_without_the_manifest(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(binary, "BINARY_CACHE_DIR", str(tmp_path / "cache"))
+    url = f"{GITHUB_RAW_OUTPUTS}/mainnet.addrbook"
+    responses.add(responses.GET, url, body=pack_addrbook(FLATBOOK))
+    responses.add(
+        responses.GET,
+        f"{GITHUB_RAW_OUTPUTS}/manifest.json",
+        body=requests.ConnectionError("offline"),
+    )
+    path = binary_addrbook_path("mainnet")
+    assert len(responses.calls) == 1
+    # a recent copy is used without asking for the manifest
+    assert binary_addrbook_path("mainnet") == path
+    assert len(responses.calls) == 1
+    # an older one is checked, but still used when the manifest is unreachable
+    os.utime(path, (0, 0))
+    assert binary_addrbook_path("mainnet") == path
+    assert len(responses.calls) == 2
+    with BinaryAddrBook(path) as book:
+        assert book.address("20210418-vault/Vault") == VAULT
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "mainnet.json"
+    path.write_text(json.dumps(FLATBOOK))
+    with pytest.raises(ValueError):
+        BinaryAddrBook(str(path))
+    path = tmp_path / "truncated.addrbook"
+    path.write_bytes(pack_addrbook(FLATBOOK)[:-1])
+    with pytest.raises(ValueError):
+        BinaryAddrBook(str(path))
+
+
+def test_published_binary_books_match_json():
+    with open("outputs/mainnet.json") as f:
+        flatbook = json.load(f)
+    with open("outputs/mainnet_reverse.json") as f:
+        reversebook = json.load(f)
+    with BinaryAddrBook.load("mainnet") as book:
+        assert len(book) == len(flatbook)
+        for name, address in flatbook.items():
+            assert book.address(name) == to_checksum_address(address)
+        for address, name in reversebook.items():
+            assert book.name(address) == name
@@ -0,0 +1,75 @@
+import pytest
+import requests
+import responses
+
+from bal_addresses import SourceCache, source_cache, get_json
+
+
+URL = (
+    "https://raw.githubusercontent.com/balancer/bal_addresses/main/extras/signers.json"
+)
+
+
+def test_loader_runs_once_per_key():
+    cache = SourceCache()
+    calls = []
+    loader = lambda: calls.append(1) or {"a": 1}
+    assert cache.get("key", loader) == {"a": 1}
+    assert cache.get("key", loader) == {"a": 1}
+    assert len(calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_expired_entries_are_reloaded():
+    cache = SourceCache(ttl=0)
+    calls = []
+    cache.get("key", lambda: calls.append(1))
+    cache.get("key", lambda: calls.append(1))
+    assert len(calls) == 2
+    assert cache.misses == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SourceCache(maxsize=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: 1)
+    cache.get("c", lambda: 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_hold_keeps_entries():
+    cache = SourceCache(ttl=0, maxsize=1)
+    with cache.hold():
+        cache.get("a", lambda: 1)
+        cache.get("b", lambda: 2)
+        assert "a" in cache and "b" in cache
+        assert cache.get("a", lambda: 3) == 1
+    assert len(cache) == 1
+
+
+@responses.activate
+def test_get_json_is_shared():
+    responses.add(responses.GET, URL, json={"dao": {}})
+    assert get_json(URL) == {"dao": {}}
+    assert get_json(URL) == {"dao": {}}
+    assert len(responses.calls) == 1
+    assert source_cache.hits == 1
+
+
+@responses.activate
+def test_get_json_not_found():
+    responses.add(responses.GET, URL, json={}, status=404)
+    assert get_json(URL) is None
+
+
+@responses.activate
+def test_get_json_errors_are_not_cached():
+    responses.add(responses.GET, URL, status=503)
+    responses.add(responses.GET, URL, json={"dao": {}})
+    with pytest.raises(requests.HTTPError):
+        get_json(URL)
+    assert URL not in source_cache
+    assert get_json(URL) == {"dao": {}}
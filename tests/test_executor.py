@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from bal_addresses.executor import map_chains, map_chains_isolated
+
+
+def test_map_chains_keeps_chain_order():
+    # later chains finish first
+    delays = {"mainnet": 0.03, "arbitrum": 0.02, "base": 0.01}
+    result = map_chains(lambda chain: time.sleep(delays[chain]) or chain, delays)
+    assert list(result) == list(delays)
+
+
+def test_map_chains_is_bounded():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(chain):
+        with lock:
+            running.append(chain)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(chain)
+
+    map_chains(work, [f"chain{i}" for i in range(8)], max_workers=2)
+    assert max(peak) == 2
+
+
+def test_map_chains_raises():
+    def work(chain):
+        if chain == "base":
+            raise ValueError(chain)
+        return chain
+
+    with pytest.raises(ValueError):
+        map_chains(work, ["mainnet", "base"])
+
+
+def test_map_chains_isolated():
+    def work(chain):
+        if chain in ("gnosis", "base"):
+            raise ValueError(chain)
+        return chain.upper()
+
+    results, failures = map_chains_isolated(
+        work, ["mainnet", "gnosis", "arbitrum", "base"]
+    )
+    assert results == {"mainnet": "MAINNET", "arbitrum": "ARBITRUM"}
+    assert list(failures) == ["gnosis", "base"]
+    assert isinstance(failures["gnosis"], ValueError)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+gen_core_pools = pytest.importorskip("gen_core_pools")
+
+WHITELIST = {
+    "mainnet": {"0xAAAA": "kept", "0xbbbb": "orphaned"},
+    "arbitrum": {"0xcccc": "kept"},
+    "gnosis": {"0xdddd": "orphaned"},
+    "polygon": {},
+}
+VOTING_LIST = [
+    {"id": "0xaaaa", "chain": "MAINNET"},
+    {"id": "0xCCCC", "chain": "ARBITRUM"},
+]
+
+
+class FakeBalPoolsGauges:
+    instances = []
+
+    def __init__(self, chain="mainnet", use_cached_core_pools=True):
+        self.chain = chain
+        self.instances.append(chain)
+
+    @property
+    def vebal_voting_list(self):
+        return [{"id": "0xeeee", "chain": self.chain.upper()}]
+
+
+@pytest.fixture
+def whitelist(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gen_core_pools, "BalPoolsGauges", FakeBalPoolsGauges)
+    FakeBalPoolsGauges.instances = []
+    (tmp_path / "config").mkdir()
+    path = tmp_path / "config" / "core_pools_whitelist.json"
+    path.write_text(json.dumps(WHITELIST))
+    return path
+
+
+def test_shared_voting_list_is_reused(whitelist):
+    orphaned = gen_core_pools.remove_orphaned_whitelist_entries(VOTING_LIST)
+    # only the chain missing from the shared list is queried
+    assert FakeBalPoolsGauges.instances == ["gnosis"]
+    assert orphaned == {
+        "mainnet": {"0xbbbb": "orphaned"},
+        "gnosis": {"0xdddd": "orphaned"},
+    }
+    assert json.loads(whitelist.read_text()) == {
+        "mainnet": {"0xAAAA": "kept"},
+        "arbitrum": {"0xcccc": "kept"},
+        "gnosis": {},
+        "polygon": {},
+    }
+
+
+def test_without_shared_voting_list_every_chain_is_queried(whitelist):
+    gen_core_pools.remove_orphaned_whitelist_entries()
+    assert sorted(FakeBalPoolsGauges.instances) == ["arbitrum", "gnosis", "mainnet"]
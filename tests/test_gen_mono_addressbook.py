@@ -0,0 +1,39 @@
+import importlib
+import json
+
+
+def write_output(root, version, task, chain, data):
+    path = root / version / "tasks" / task / "output"
+    path.mkdir(parents=True, exist_ok=True)
+    (path / f"{chain}.json").write_text(json.dumps(data))
+
+
+def test_process_deployments(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEPLOYMENTS_REPO_ROOT_URL", str(tmp_path))
+    gen_mono_addressbook = importlib.import_module("gen_mono_addressbook")
+    monkeypatch.setattr(gen_mono_addressbook, "basepath", str(tmp_path))
+    write_output(tmp_path, "v2", "20210418-vault", "mainnet", {"Vault": "0x1"})
+    write_output(tmp_path, "v2", "20210418-vault", "arbitrum", {"Vault": "0x2"})
+    write_output(tmp_path, "v3", "20241204-v3-vault", "mainnet", {"Vault": "0x3"})
+    # a task shipping outputs in both trees is merged
+    write_output(tmp_path, "v2", "20220101-both", "mainnet", {"A": "0x4"})
+    write_output(tmp_path, "v3", "20220101-both", "mainnet", {"B": "0x5"})
+    (tmp_path / "v3" / "tasks" / "20230101-no-output").mkdir()
+
+    tasks = [
+        "20210418-vault",
+        "20220101-both",
+        "20230101-no-output",
+        "20241204-v3-vault",
+    ]
+    result = gen_mono_addressbook.process_deployments(tasks, max_workers=2)
+    assert json.dumps(result) == json.dumps(
+        {
+            "arbitrum": {"20210418-vault": {"Vault": "0x2"}},
+            "mainnet": {
+                "20210418-vault": {"Vault": "0x1"},
+                "20220101-both": {"A": "0x4", "B": "0x5"},
+                "20241204-v3-vault": {"Vault": "0x3"},
+            },
+        }
+    )
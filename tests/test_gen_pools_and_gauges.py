@@ -0,0 +1,167 @@
+import copy
+
+import pytest
+from munch import Munch
+
+gen_pools_and_gauges = pytest.importorskip("gen_pools_and_gauges")
+
+
+def nested_loop_root_gauges(result, gauges):
+    """
+    The join as originally written, O(root gauges * gauges)
+    """
+    df = []
+    for root_gauge in result:
+        for chain in gauges:
+            for symbol, gauge in gauges[chain].items():
+                if "chain" not in root_gauge:
+                    continue
+                if root_gauge["recipient"] == gauge:
+                    root_gauge["symbol"] = symbol[:-4].replace(
+                        "-gauge-", f"-{root_gauge['chain'].lower()}-root-"
+                    )
+                    root_gauge["symbol"] += f"{root_gauge['id'][2:6]}"
+                    df.append(root_gauge)
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame(df)
+    df = df[~df.duplicated()]
+    return df.set_index("symbol")["id"].to_dict()
+
+
+def pandas_process_query_pools(result):
+    """
+    Symbol disambiguation as originally written, retrying longer suffixes with pandas
+    """
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame([{"address": p.address, "symbol": p.symbol} for p in result])
+    df["original_symbol"] = df["symbol"]
+    df["symbol"] = df["symbol"] + "-" + df["address"].str[2:6]
+    colliding_symbols = df[df["symbol"].duplicated(keep=False)][
+        "original_symbol"
+    ].unique()
+    for original_symbol_with_collision in colliding_symbols:
+        collision_group_mask = df["original_symbol"] == original_symbol_with_collision
+        collision_group = df[collision_group_mask]
+        for address_suffix_length in range(4, 43):
+            symbols_with_longer_suffix = (
+                collision_group["original_symbol"]
+                + "-"
+                + collision_group["address"].str[2 : 2 + address_suffix_length]
+            )
+            if symbols_with_longer_suffix.nunique() == len(symbols_with_longer_suffix):
+                df.loc[collision_group_mask, "symbol"] = symbols_with_longer_suffix
+                break
+    df = df.drop(columns=["original_symbol"])
+    return df.sort_values("address").set_index("symbol")["address"].to_dict()
+
+
+POOLS = [
+    Munch(
+        address="0xabcd100000000000000000000000000000000001", symbol="B-80BAL-20WETH"
+    ),
+    Munch(
+        address="0xabcd200000000000000000000000000000000002", symbol="B-80BAL-20WETH"
+    ),
+    Munch(
+        address="0xabcd210000000000000000000000000000000003", symbol="B-80BAL-20WETH"
+    ),
+    Munch(
+        address="0x1234000000000000000000000000000000000004", symbol="B-80BAL-20WETH"
+    ),
+    Munch(address="0xabcd200000000000000000000000000000000005", symbol="bb-a-USD"),
+    Munch(address="0x9999000000000000000000000000000000000006", symbol="bb-a-USD"),
+    Munch(address="0xabcd000000000000000000000000000000000007", symbol="stETH"),
+    Munch(address="0x5555000000000000000000000000000000000008", symbol="WETH-EIGEN"),
+]
+
+
+def test_pools_match_pandas():
+    expected = pandas_process_query_pools(
+        [pool for pool in POOLS if pool.symbol != "WETH-EIGEN"]
+    )
+    result = gen_pools_and_gauges.process_query_pools(POOLS)
+    assert list(result.items()) == list(expected.items())
+    assert result == {
+        "B-80BAL-20WETH-123400": "0x1234000000000000000000000000000000000004",
+        "bb-a-USD-9999": "0x9999000000000000000000000000000000000006",
+        "stETH-abcd": "0xabcd000000000000000000000000000000000007",
+        "B-80BAL-20WETH-abcd10": "0xabcd100000000000000000000000000000000001",
+        "B-80BAL-20WETH-abcd20": "0xabcd200000000000000000000000000000000002",
+        "bb-a-USD-abcd": "0xabcd200000000000000000000000000000000005",
+        "B-80BAL-20WETH-abcd21": "0xabcd210000000000000000000000000000000003",
+    }
+
+
+def test_gauges_duplicate_symbol_raises():
+    gauges = [
+        {"address": "0xabcd000000000000000000000000000000000001", "symbol": "g"},
+        {"address": "0xabcd000000000000000000000000000000000002", "symbol": "g"},
+    ]
+    with pytest.raises(RuntimeError):
+        gen_pools_and_gauges.process_query_gauges(gauges)
+
+
+GAUGES = {
+    "arbitrum": {
+        "B-wstETH-WETH-gauge-aaaa": "0xaaaa000000000000000000000000000000000001",
+        "B-rETH-WETH-gauge-bbbb": "0xbbbb000000000000000000000000000000000002",
+    },
+    "base": {
+        "B-cbETH-WETH-gauge-cccc": "0xcccc000000000000000000000000000000000003",
+        # same address as on arbitrum, the later chain wins
+        "B-wstETH-WETH-gauge-dddd": "0xaaaa000000000000000000000000000000000001",
+    },
+}
+ROOT_GAUGES = [
+    {
+        "id": "0x1111000000000000000000000000000000000001",
+        "recipient": "0xaaaa000000000000000000000000000000000001",
+        "chain": "Arbitrum",
+    },
+    {
+        "id": "0x2222000000000000000000000000000000000002",
+        "recipient": "0xcccc000000000000000000000000000000000003",
+        "chain": "Base",
+    },
+    # listed twice by the subgraph
+    {
+        "id": "0x2222000000000000000000000000000000000002",
+        "recipient": "0xcccc000000000000000000000000000000000003",
+        "chain": "Base",
+    },
+    # mainnet gauge, no child
+    {"id": "0x3333000000000000000000000000000000000003"},
+    # child gauge unknown
+    {
+        "id": "0x4444000000000000000000000000000000000004",
+        "recipient": "0xeeee000000000000000000000000000000000005",
+        "chain": "Gnosis",
+    },
+]
+
+
+def test_root_gauges_match_nested_loop():
+    expected = nested_loop_root_gauges(copy.deepcopy(ROOT_GAUGES), GAUGES)
+    result = gen_pools_and_gauges.process_query_root_gauges(
+        copy.deepcopy(ROOT_GAUGES), GAUGES
+    )
+    assert list(result.items()) == list(expected.items())
+    assert result == {
+        "B-wstETH-WETH-arbitrum-root-1111": "0x1111000000000000000000000000000000000001",
+        "B-cbETH-WETH-base-root-2222": "0x2222000000000000000000000000000000000002",
+    }
+
+
+def test_root_gauge_children():
+    assert gen_pools_and_gauges.root_gauge_children(ROOT_GAUGES, GAUGES) == {
+        "0x1111000000000000000000000000000000000001": {
+            "chain": "base",
+            "child_gauge": "0xaaaa000000000000000000000000000000000001",
+            "child_symbol": "B-wstETH-WETH-gauge-dddd",
+        },
+        "0x2222000000000000000000000000000000000002": {
+            "chain": "base",
+            "child_gauge": "0xcccc000000000000000000000000000000000003",
+            "child_symbol": "B-cbETH-WETH-gauge-cccc",
+        },
+    }
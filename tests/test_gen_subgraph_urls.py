@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+
+import pytest
+import requests
+import responses
+
+gen_subgraph_urls = pytest.importorskip("gen_subgraph_urls")
+
+FAST = "https://subgraph.example/fast"
+SLOW = "https://subgraph.example/slow"
+MISSING = "https://subgraph.example/missing"
+DOWN = "https://subgraph.example/down"
+
+
+@responses.activate
+def test_probe_urls():
+    meta = {"data": {"_meta": {"block": {"number": 1}}}}
+
+    def slow(request):
+        time.sleep(0.05)
+        return 200, {}, json.dumps(meta)
+
+    responses.post(FAST, json=meta)
+    responses.add_callback(responses.POST, SLOW, callback=slow)
+    responses.post(MISSING, status=404)
+    responses.post(DOWN, body=requests.ConnectTimeout())
+
+    probes = gen_subgraph_urls.probe_urls([FAST, SLOW, MISSING, DOWN, FAST])
+    assert list(probes) == [FAST, SLOW, MISSING, DOWN]
+    assert [code for code, _ in probes.values()] == [200, 200, 404, "timeout"]
+    assert probes[SLOW][1] >= 50
+    # every url probed once, with the _meta query
+    assert len(responses.calls) == 4
+    assert json.loads(responses.calls[0].request.body) == gen_subgraph_urls.PROBE_QUERY
+
+
+@responses.activate
+def test_probes_run_concurrently():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def callback(request):
+        with lock:
+            running.append(request.url)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(request.url)
+        return 200, {}, "{}"
+
+    urls = [f"https://subgraph.example/{i}" for i in range(8)]
+    for url in urls:
+        responses.add_callback(responses.POST, url, callback=callback)
+    gen_subgraph_urls.probe_urls(urls, max_workers=4)
+    assert max(peak) == 4
+
+
+def test_build_subgraph_urls():
+    urls_by_chain = {
+        "mainnet": {"core": FAST, "gauges": SLOW, "blocks": MISSING},
+        "zkevm": {"core": DOWN},
+    }
+    probes = {
+        FAST: (200, 12),
+        SLOW: (200, 80),
+        MISSING: (404, 5),
+        DOWN: ("timeout", 10000),
+    }
+    assert gen_subgraph_urls.build_subgraph_urls(urls_by_chain, probes) == {
+        "mainnet": {
+            "core": FAST,
+            "gauges": SLOW,
+            "blocks": {404: MISSING},
+        },
+        "zkevm": {"core": {"timeout": DOWN}},
+    }
+    assert gen_subgraph_urls.build_subgraph_latency(urls_by_chain, probes) == {
+        "mainnet": {"core": 12, "gauges": 80},
+    }
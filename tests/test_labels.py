@@ -0,0 +1,38 @@
+from bal_addresses.labels import unique_labels
+
+
+def test_unique_names_use_min_length():
+    assert unique_labels(
+        ["a", "b"],
+        [
+            "0x1234000000000000000000000000000000000001",
+            "0x1234000000000000000000000000000000000002",
+        ],
+    ) == ["a-1234", "b-1234"]
+
+
+def test_collisions_extend_the_whole_group():
+    names = ["a", "a", "a", "b"]
+    addresses = [
+        "0xabcd100000000000000000000000000000000001",
+        "0x1234000000000000000000000000000000000002",
+        "0xabcd120000000000000000000000000000000003",
+        "0xabcd100000000000000000000000000000000004",
+    ]
+    assert unique_labels(names, addresses) == [
+        "a-abcd10",
+        "a-123400",
+        "a-abcd12",
+        "b-abcd",
+    ]
+
+
+def test_separator_and_no_extend():
+    addresses = [
+        "0xabcd100000000000000000000000000000000001",
+        "0xabcd200000000000000000000000000000000002",
+    ]
+    assert unique_labels(["a-", "a-"], addresses, separator="", extend=False) == [
+        "a-abcd",
+        "a-abcd",
+    ]
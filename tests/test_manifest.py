@@ -0,0 +1,76 @@
+import json
+import os
+
+from bal_addresses.manifest import (
+    Manifest,
+    changed_outputs,
+    hash_file,
+    hash_json,
+)
+
+
+def test_hash_json_ignores_key_order():
+    assert hash_json({"a": 1, "b": [1, 2]}) == hash_json({"b": [1, 2], "a": 1})
+    assert hash_json({"a": 1}) != hash_json({"a": 2})
+
+
+def test_write_json_records_outputs(tmp_path):
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    path = str(tmp_path / "mainnet.json")
+    inputs = {"pools.json": "abc"}
+    assert manifest.write_json(path, {"b": 1, "a": 2}, inputs)
+    with open(path) as f:
+        assert f.read() == json.dumps({"b": 1, "a": 2}, indent=2) + "\n"
+    assert manifest.entries["mainnet.json"]["sha256"] == hash_file(path)
+    assert manifest.is_current(path, inputs)
+    assert not manifest.is_current(path, {"pools.json": "def"})
+
+    # same content is not written again
+    mtime = os.stat(path).st_mtime_ns
+    assert not manifest.write_json(path, {"b": 1, "a": 2}, inputs)
+    assert os.stat(path).st_mtime_ns == mtime
+
+    # an output edited by hand is no longer current
+    with open(path, "a") as f:
+        f.write(" ")
+    assert not manifest.is_current(path, inputs)
+
+
+def test_outputs_without_inputs_are_never_current(tmp_path):
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    path = str(tmp_path / "subgraph_urls.json")
+    manifest.write_json(path, {"mainnet": {}})
+    assert manifest.entries["subgraph_urls.json"] == {"sha256": hash_file(path)}
+    assert not manifest.is_current(path, {})
+
+
+def test_save_and_load(tmp_path):
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    os.makedirs(tmp_path / "permissions")
+    manifest.write_json(str(tmp_path / "permissions" / "gnosis.json"), {})
+    manifest.write_json(
+        str(tmp_path / "core_pools.json"),
+        {"b": 1, "a": 2},
+        {"pools.json": "abc"},
+        sort_keys=True,
+    )
+    manifest.save()
+    loaded = Manifest(str(tmp_path / "manifest.json"))
+    assert list(loaded.entries) == ["core_pools.json", "permissions/gnosis.json"]
+    assert loaded.is_current(str(tmp_path / "core_pools.json"), {"pools.json": "abc"})
+
+
+def test_changed_outputs():
+    manifest = {
+        "mainnet.json": {"sha256": "1", "inputs": "x"},
+        "gnosis.json": {"sha256": "2", "inputs": "x"},
+        "base.json": {"sha256": "3", "inputs": "x"},
+    }
+    known = {"mainnet.json": "1", "gnosis.json": "old"}
+    assert changed_outputs(known, manifest) == ["gnosis.json", "base.json"]
+
+
+def test_published_manifest_matches_outputs():
+    manifest = Manifest()
+    for name, entry in manifest.entries.items():
+        assert hash_file(os.path.join("outputs", name)) == entry["sha256"], name
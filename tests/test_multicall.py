@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from bal_addresses.multicall import Multicall
+
+from .evm_standin import AUTHORIZER_ADDRESS, EVMStandIn, account, role
+
+
+def authorizer_contract(w3):
+    with open("bal_addresses/abis/Authorizer.json") as f:
+        return w3.eth.contract(address=AUTHORIZER_ADDRESS, abi=json.load(f))
+
+
+def seeded_chain(multicall=True):
+    chain = EVMStandIn(multicall=multicall)
+    for r in range(1, 21):
+        for a in range(r % 4):
+            chain.grant(role(r), account(100 * r + a))
+    return chain
+
+
+@pytest.mark.parametrize("multicall", [True, False])
+def test_results_match_single_calls(multicall):
+    chain = seeded_chain(multicall)
+    w3 = chain.w3()
+    authorizer = authorizer_contract(w3)
+    calls = [authorizer.functions.getRoleMemberCount(role(r)) for r in range(25)]
+    calls += [authorizer.functions.getRoleMember(role(3), i) for i in range(3)]
+    expected = [fn.call() for fn in calls]
+    singles = chain.count("eth_call")
+    assert Multicall(w3, chunk_size=10).call(calls) == expected
+    batched = chain.count("eth_call") - singles
+    assert batched == (3 if multicall else len(calls))
+    assert expected[-1] == account(302)
+
+
+def test_failed_call_raises_like_single_call():
+    w3 = seeded_chain().w3()
+    authorizer = authorizer_contract(w3)
+    with pytest.raises(Exception, match="index out of bounds"):
+        Multicall(w3).call([authorizer.functions.getRoleMember(role(1), 5)])
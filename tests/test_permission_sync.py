@@ -0,0 +1,145 @@
+import json
+import os
+
+import pytest
+
+from bal_addresses.manifest import Manifest
+
+from bal_addresses.multicall import Multicall
+
+from .evm_standin import EVMStandIn, account, role
+from .test_multicall import authorizer_contract
+
+gen_current_permissions = pytest.importorskip("gen_current_permissions")
+
+
+def test_sync_matches_full_read():
+    chain = EVMStandIn()
+    w3 = chain.w3()
+    authorizer = authorizer_contract(w3)
+    multicall = Multicall(w3)
+    action_ids = [role(r) for r in range(1, 11)]
+    for r in range(1, 6):
+        for a in range(4):
+            chain.grant(role(r), account(a))
+    checkpoint = chain.block
+    permissions = gen_current_permissions.read_role_members(
+        authorizer, action_ids, multicall, checkpoint
+    )
+
+    chain.revoke(role(1), account(0))  # last member moves into the gap
+    chain.revoke(role(2), account(3))
+    chain.grant(role(2), account(9))
+    for a in range(4):
+        chain.revoke(role(3), account(a))
+    chain.grant(role(3), account(7))  # emptied and granted again
+    for a in range(4):
+        chain.revoke(role(4), account(a))
+    chain.grant(role(7), account(1))  # had no members at the checkpoint
+    chain.grant(role(99), account(1))  # not an action id of the chain
+
+    chain.requests.clear()
+    synced = gen_current_permissions.sync_role_members(
+        authorizer,
+        action_ids,
+        permissions,
+        checkpoint + 1,
+        chain.block,
+        block_range=5,
+    )
+    assert chain.count("eth_getLogs") == 3
+    # memberless action ids are replayed too, nothing is read
+    assert chain.count("eth_call") == 0
+    expected = gen_current_permissions.read_role_members(
+        authorizer, action_ids, multicall, chain.block
+    )
+    assert synced == expected
+    assert list(synced) == list(expected)
+    assert synced[role(1)] == [account(3), account(1), account(2)]
+    assert role(4) not in synced
+
+
+def test_apply_role_events_without_changes():
+    permissions = {role(1): [account(1)]}
+    assert gen_current_permissions.apply_role_events(permissions, []) == {
+        role(1): [account(1)]
+    }
+
+
+def test_read_role_members():
+    chain = EVMStandIn()
+    for r in range(1, 21):
+        for a in range(r % 4):
+            chain.grant(role(r), account(100 * r + a))
+    w3 = chain.w3()
+    action_ids = [role(r) for r in range(1, 21)]
+    members = gen_current_permissions.read_role_members(
+        authorizer_contract(w3), action_ids, Multicall(w3, chunk_size=7)
+    )
+    assert list(members) == [role(r) for r in range(1, 21) if r % 4]
+    assert members[role(3)] == [account(300), account(301), account(302)]
+    # counts and members each take ceil(n / chunk_size) calls
+    assert chain.count("eth_call") == 3 + 5
+
+
+def test_rejected_log_pages_are_split():
+    chain = EVMStandIn(max_log_range=4)
+    for a in range(10):
+        chain.grant(role(1), account(a))
+    authorizer = authorizer_contract(chain.w3())
+    events = gen_current_permissions.fetch_role_events(authorizer, 1, chain.block)
+    assert [e.args.account for e in events] == [account(a) for a in range(10)]
+    assert chain.count("eth_getLogs") > 3
+
+
+def test_reads_and_checkpoint_follow_the_finalized_block(monkeypatch, tmp_path):
+    chain = EVMStandIn(finality=3)
+    w3 = chain.w3()
+    authorizer = authorizer_contract(w3)
+    action_ids = [role(r) for r in range(1, 4)]
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("outputs/permissions/active")
+    monkeypatch.setattr(gen_current_permissions, "Web3Rpc", lambda *args: w3)
+    monkeypatch.setattr(
+        gen_current_permissions, "get_authorizer", lambda chain_name, w3: authorizer
+    )
+    monkeypatch.setattr(
+        gen_current_permissions, "get_action_ids", lambda chain_name: action_ids
+    )
+    manifest = Manifest(str(tmp_path / "outputs" / "manifest.json"))
+
+    def generate(checkpoint=None):
+        checkpoint = gen_current_permissions.generate_chain_files(
+            "mainnet", manifest, checkpoint=checkpoint
+        )
+        with open("outputs/permissions/active/mainnet.json") as f:
+            return checkpoint, json.load(f)
+
+    for a in range(5):
+        chain.grant(role(1), account(a))
+    checkpoint, permissions = generate()
+    # the last three grants are not final yet
+    assert checkpoint["block"] == chain.block - 3
+    assert permissions == {role(1): [account(a) for a in range(2)]}
+
+    chain.grant(role(2), account(9))
+    chain.mine(3)
+    chain.requests.clear()
+    checkpoint, permissions = generate(checkpoint)
+    assert chain.count("eth_call") == 0
+    assert permissions == {
+        role(1): [account(a) for a in range(5)],
+        role(2): [account(9)],
+    }
+
+    # a changed action-ids.json is read in full
+    action_ids.append(role(4))
+    chain.requests.clear()
+    assert generate(checkpoint)[1] == permissions
+    assert chain.count("eth_call") > 0
+
+
+def test_head_minus_confirmations_without_finalized_tag():
+    chain = EVMStandIn(finality=None)
+    chain.mine(100)
+    assert gen_current_permissions.finalized_block(chain.w3(), 10) == chain.block - 10
@@ -0,0 +1,139 @@
+import pytest
+
+from bal_addresses import AddrBook, BalPermissions, NoResultError, source_cache
+from bal_addresses.addresses import GITHUB_DEPLOYMENTS_RAW, GITHUB_RAW_OUTPUTS
+
+VAULT = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+
+
+def load_permissions(action_ids, active=None, chain="mainnet", addr_book=None):
+    permissions_url, action_ids_url = (url for url, _ in BalPermissions.sources(chain))
+    source_cache.set(permissions_url, active or {})
+    source_cache.set(action_ids_url, action_ids)
+    return BalPermissions(chain, addr_book)
+
+
+def seed_addr_book(chain="mainnet"):
+    """
+    Serve the remote AddrBook sources of chain from the cache, with only the vault deployed
+    """
+    for url, local_path in AddrBook.sources(chain):
+        if local_path is None:
+            source_cache.set(url, {})
+    source_cache.set(
+        f"{GITHUB_DEPLOYMENTS_RAW}/addresses/{chain}.json",
+        {
+            "20210418-vault": {
+                "status": "ACTIVE",
+                "contracts": [{"name": "Vault", "address": VAULT}],
+            }
+        },
+    )
+    source_cache.set(
+        f"{GITHUB_RAW_OUTPUTS}/deployments.json",
+        {"active": {chain: {"20210418-vault": {"Vault": VAULT}}}},
+    )
+
+
+def test_construction_indexes_paths():
+    p = load_permissions(
+        {
+            "20210418-vault": {
+                "Vault": {
+                    "useAdaptor": False,
+                    "actionIds": {"setPaused(bool)": "0x01", "setRelayer()": "0x02"},
+                }
+            }
+        }
+    )
+    assert p.action_id_by_path == {
+        "20210418-vault/Vault/setPaused(bool)": "0x01",
+        "20210418-vault/Vault/setRelayer()": "0x02",
+    }
+    assert p.paths_by_action_id["0x01"] == {"20210418-vault/Vault/setPaused(bool)"}
+
+
+def test_construction_detects_duplicate_paths():
+    with pytest.raises(AssertionError, match="shows up twice"):
+        load_permissions(
+            {
+                "a/b": {"C": {"useAdaptor": False, "actionIds": {"fx()": "0x01"}}},
+                "a": {"b/C": {"useAdaptor": False, "actionIds": {"fx()": "0x02"}}},
+            }
+        )
+
+
+def test_caller_names_share_one_addr_book(monkeypatch):
+    seed_addr_book()
+    p = load_permissions(
+        {}, active={"0x01": [VAULT, "0x" + "ab" * 20], "0x02": [VAULT]}
+    )
+    built = []
+    init = AddrBook.__init__
+
+    def counting_init(self, *args, **kwargs):
+        built.append(self)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(AddrBook, "__init__", counting_init)
+    assert p.allowed_caller_names("0x01") == ["20210418-vault/Vault", "undef"]
+    assert p.allowed_caller_names_many(["0x01", "0x02", "0x03"]) == {
+        "0x01": ["20210418-vault/Vault", "undef"],
+        "0x02": ["20210418-vault/Vault"],
+        "0x03": [],
+    }
+    with pytest.raises(NoResultError):
+        p.allowed_caller_names("0x03")
+    assert len(built) == 1
+
+
+def test_accepts_addr_book():
+    seed_addr_book()
+    book = AddrBook("mainnet")
+    p = load_permissions(
+        {
+            "20210418-vault": {
+                "Vault": {"useAdaptor": False, "actionIds": {"fx()": "0x01"}}
+            }
+        },
+        addr_book=book,
+    )
+    assert p.addr_book is book
+    assert p.search_unique_path_by_unique_deployment("vault", "fx") == {
+        "path": "20210418-vault/Vault/fx()",
+        "action_id": "0x01",
+    }
+
+
+def test_deployment_scoped_search():
+    seed_addr_book()
+    contract = {
+        "useAdaptor": False,
+        "actionIds": {"setPaused(bool)": "0x01", "setRelayerApproval()": "0x02"},
+    }
+    p = load_permissions(
+        {
+            "20210418-vault": {"Vault": contract, "Other": contract},
+            "20210418-vault-extension": {"Vault": contract},
+            "20220101-pool": {"Pool": contract},
+        }
+    )
+    results = p.search_many_paths_by_unique_deployment("vault", "setPaused")
+    # same as a plain path search on the deployment name, filtered by function
+    assert [r.path for r in results] == [
+        path for path in p.search_path("20210418-vault") if "setPaused" in path
+    ]
+    assert [r.path for r in results] == [
+        "20210418-vault/Vault/setPaused(bool)",
+        "20210418-vault/Other/setPaused(bool)",
+        "20210418-vault-extension/Vault/setPaused(bool)",
+    ]
+    assert p.action_id("20220101-pool", "Pool", "setRelayerApproval()") == "0x02"
+    with pytest.raises(NoResultError):
+        p.action_id("20220101-pool", "Vault", "setPaused(bool)")
+    assert p.paths_by_fx["setPaused(bool)"] == [
+        "20210418-vault/Vault/setPaused(bool)",
+        "20210418-vault/Other/setPaused(bool)",
+        "20210418-vault-extension/Vault/setPaused(bool)",
+        "20220101-pool/Pool/setPaused(bool)",
+    ]
@@ -0,0 +1,31 @@
+import pytest
+import requests
+import responses
+
+from bal_addresses import RateProviders
+
+TOKEN = "0x7f39C581F595B53c5cb19bD0b3f8dA6c935E2Ca0"
+PROVIDER = "0x72D07D7DcA67b8A406aD1Ec34ce969c90bFEE768"
+REGISTRY = {
+    "ethereum": {
+        PROVIDER: {
+            "asset": TOKEN,
+            "name": "WstETHRateProvider",
+            "summary": "safe",
+            "review": "./WstEthRateProvider.md",
+        }
+    }
+}
+
+
+@responses.activate
+def test_failed_registry_fetch_is_retried():
+    responses.add(responses.GET, RateProviders.source_url(), status=503)
+    responses.add(responses.GET, RateProviders.source_url(), json=REGISTRY)
+    with pytest.raises(requests.HTTPError):
+        RateProviders("mainnet")
+    rate_providers = RateProviders("mainnet")
+    assert rate_providers.get_review_for_safe_rate_provder(TOKEN).endswith(
+        "rate-providers/WstEthRateProvider.md"
+    )
+    assert list(RateProviders.SUPPORTED_CHAINS) == ["ethereum"]
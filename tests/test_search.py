@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from bal_addresses.search import SubstringIndex
+
+
+KEYS = [
+    "20210418-vault/Vault",
+    "20210418-vault/BalancerHelpers",
+    "20210418-authorizer/Authorizer",
+    "20221111-authorizer-adaptor/AuthorizerAdaptor",
+    "pools/B-80BAL-20WETH-5c6e",
+    "gauges/B-80BAL-20WETH-gauge-4e3c",
+    "root_gauges/B-80BAL-20WETH-arbitrum-root-1a2b",
+    "multisigs/dao",
+    "EOA/maxis/tritium",
+]
+
+
+@pytest.mark.parametrize(
+    "substr",
+    [
+        "",
+        "a",
+        "da",
+        "dao",
+        "vault",
+        "Vault",
+        "20210418-",
+        "gauge",
+        "80BAL-20WETH",
+        "zzz",
+    ],
+)
+def test_matches_linear_scan(substr):
+    index = SubstringIndex(KEYS)
+    assert index.search(substr) == [key for key in KEYS if substr in key]
+
+
+def test_matches_linear_scan_on_addressbook():
+    with open("outputs/mainnet.json") as f:
+        keys = list(json.load(f))
+    index = SubstringIndex(keys)
+    for key in keys[::25]:
+        for substr in [key, key[:5], key[-7:], key[3:12]]:
+            assert index.search(substr) == [k for k in keys if substr in k]
@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bal_addresses import GraphQLRequestError, NoResultError, SubgraphResolver
+from bal_addresses import subgraph
+
+QUERY = "{ _meta { block { number } } }"
+
+
+class StandInSubgraph:
+    """
+    Local GraphQL endpoint answering every query with its name, optionally slow or broken
+    """
+
+    def __init__(self, name, delay=0.0, status=200):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stand_in.requests.append(body)
+                time.sleep(stand_in.delay)
+                if stand_in.status == 200:
+                    payload = {"data": {"name": stand_in.name}}
+                else:
+                    payload = {"errors": [{"message": "indexer unavailable"}]}
+                content = json.dumps(payload).encode()
+                self.send_response(stand_in.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/{name}"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.01,), daemon=True
+        )
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def subgraphs():
+    started = []
+
+    def start(name, **kwargs):
+        subgraph = StandInSubgraph(name, **kwargs)
+        started.append(subgraph)
+        return subgraph
+
+    yield start
+    for subgraph in started:
+        subgraph.close()
+
+
+def test_published_url_is_preferred(subgraphs):
+    published = subgraphs("published")
+    extra = subgraphs("extra")
+    resolver = SubgraphResolver(
+        "mainnet",
+        urls={"core": published.url},
+        latency_ms={"core": 50},
+        extra_urls={"core": [extra.url]},
+        result_ttl=0,
+    )
+    assert resolver.query("core", QUERY) == {"name": "published"}
+    assert published.requests == [{"query": QUERY}]
+    assert extra.requests == []
+
+
+def test_fails_over_and_cools_down(subgraphs):
+    broken = subgraphs("broken", status=500)
+    backup = subgraphs("backup")
+    resolver = SubgraphResolver(
+        "mainnet",
+        urls={"core": broken.url},
+        latency_ms={"core": 1},
+        extra_urls={"core": [backup.url]},
+        result_ttl=0,
+    )
+    assert resolver.query("core", QUERY) == {"name": "backup"}
+    assert resolver.query("core", QUERY) == {"name": "backup"}
+    # the broken endpoint is skipped while it cools down
+    assert len(broken.requests) == 1
+    assert len(backup.requests) == 2
+    assert resolver.url("core") == backup.url
+
+
+def test_timeouts_count_as_failures(subgraphs):
+    slow = subgraphs("slow", delay=0.5)
+    fast = subgraphs("fast")
+    resolver = SubgraphResolver(
+        "mainnet",
+        urls={"core": slow.url},
+        latency_ms={"core": 1},
+        extra_urls={"core": [fast.url]},
+        timeout=0.1,
+        result_ttl=0,
+    )
+    assert resolver.query("core", QUERY) == {"name": "fast"}
+    assert resolver.url("core") == fast.url
+
+
+def test_lower_latency_wins(subgraphs):
+    slow = subgraphs("slow", delay=0.05)
+    fast = subgraphs("fast")
+    resolver = SubgraphResolver(
+        "mainnet",
+        urls={},
+        extra_urls={"core": [slow.url, fast.url]},
+        result_ttl=0,
+    )
+    # neither is measured yet, the first one listed goes first
+    assert resolver.query("core", QUERY) == {"name": "slow"}
+    resolver.endpoints["core"][1].record_success(1)
+    assert resolver.query("core", QUERY) == {"name": "fast"}
+
+
+def test_results_are_cached(subgraphs):
+    subgraph = subgraphs("core")
+    resolver = SubgraphResolver("mainnet", urls={"core": subgraph.url})
+    assert resolver.query("core", QUERY) == resolver.query("core", QUERY)
+    resolver.query("core", QUERY, {"first": 1})
+    assert len(subgraph.requests) == 2
+    assert subgraph.requests[1] == {"query": QUERY, "variables": {"first": 1}}
+
+
+def test_all_endpoints_failing_raises(subgraphs):
+    broken = subgraphs("broken", status=503)
+    resolver = SubgraphResolver("mainnet", urls={"core": {"503": broken.url}})
+    with pytest.raises(GraphQLRequestError):
+        resolver.query("core", QUERY)
+    with pytest.raises(NoResultError):
+        resolver.query("gauges", QUERY)
+
+
+def test_endpoints_from_published_urls():
+    resolver = SubgraphResolver(
+        "mainnet",
+        urls={
+            "core": "https://core",
+            "gauges": {"404": "https://gauges"},
+        },
+        latency_ms={"core": 120},
+    )
+    assert resolver.subgraph_types == ["core", "gauges"]
+    (core,) = resolver.endpoints["core"]
+    assert core.latency_ms == 120
+    (gauges,) = resolver.endpoints["gauges"]
+    assert gauges.url == "https://gauges"
+    assert gauges.error_rate == 1.0
+
+
+def test_published_latency_seeds_endpoints(monkeypatch):
+    monkeypatch.setattr(
+        subgraph, "subgraph_urls", lambda: {"mainnet": {"core": "https://core"}}
+    )
+    monkeypatch.setattr(subgraph, "subgraph_latency", lambda: {"mainnet": {"core": 80}})
+    (core,) = SubgraphResolver("mainnet").endpoints["core"]
+    assert core.latency_ms == 80
+    # urls given by hand are not paired with published latencies
+    resolver = SubgraphResolver("mainnet", urls={"core": "https://core"})
+    (core,) = resolver.endpoints["core"]
+    assert core.latency_ms is None
@@ -0,0 +1,27 @@
+import pytest
+
+from bal_addresses import to_checksum_address, to_checksum_addresses
+from bal_addresses.utils import checksum_if_address
+
+VAULT = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+
+
+def test_to_checksum_address():
+    assert to_checksum_address(VAULT.lower()) == VAULT
+    assert to_checksum_address(VAULT.upper().replace("0X", "0x")) == VAULT
+    with pytest.raises(Exception):
+        to_checksum_address("not an address")
+
+
+def test_to_checksum_addresses():
+    zero = "0x0000000000000000000000000000000000000000"
+    assert to_checksum_addresses([VAULT.lower(), zero, VAULT.lower()]) == [
+        VAULT,
+        zero,
+        VAULT,
+    ]
+
+
+def test_checksum_if_address():
+    assert checksum_if_address(VAULT.lower()) == VAULT
+    assert checksum_if_address("ACTIVE") == "ACTIVE"
@@ -0,0 +1,61 @@
+import json
+import sys
+from pathlib import Path
+
+# importable by name, so worker processes can unpickle its functions
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+import validate_checksums
+
+CHECKSUMMED = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+LOWER = CHECKSUMMED.lower()
+
+
+def write(path, data):
+    path.write_text(json.dumps(data))
+    return path
+
+
+def test_issues_and_cache(tmp_path, monkeypatch):
+    good = write(tmp_path / "good.json", {"vault": CHECKSUMMED})
+    bad = write(tmp_path / "bad.json", {LOWER: [LOWER, "0x" + "0" * 40]})
+    cache_path = tmp_path / "cache.json"
+
+    cache = validate_checksums.ChecksumCache(cache_path)
+    results = validate_checksums.validate_files([good, bad], cache, jobs=2)
+    cache.save()
+    expected = f"Should be: {CHECKSUMMED}"
+    assert results == {
+        good: [],
+        bad: [("[key]", LOWER, expected), (f"{LOWER}[0]", LOWER, expected)],
+    }
+
+    # unchanged files are answered from the cache without being parsed
+    parsed = []
+    monkeypatch.setattr(
+        validate_checksums,
+        "validate_json_content",
+        lambda content: parsed.append(content) or [],
+    )
+    cache = validate_checksums.ChecksumCache(cache_path)
+    assert validate_checksums.validate_files([good, bad], cache, jobs=1) == results
+    assert parsed == []
+
+    write(good, {"vault": LOWER})
+    validate_checksums.validate_files([good, bad], cache, jobs=1)
+    assert len(parsed) == 1
+
+
+def test_invalid_json(tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text("{")
+    cache = validate_checksums.ChecksumCache(None)
+    ((path, address, issue),) = validate_checksums.validate_files([broken], cache)[
+        broken
+    ]
+    assert issue.startswith("Invalid JSON")
+
+
+def test_address_issue():
+    assert validate_checksums.address_issue(CHECKSUMMED) is None
+    assert validate_checksums.address_issue("0x" + "0" * 40) is None
+    assert validate_checksums.address_issue(LOWER) == f"Should be: {CHECKSUMMED}"